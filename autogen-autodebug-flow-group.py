@@ -1,15 +1,88 @@
+import io
 import os
 import sys
 import ast
+import json
+import asyncio
 import time
-import base64
+import queue
+import shutil
+import hashlib
+import atexit
+import ctypes
+import socket
+import tempfile
 import logging
+import subprocess
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import autogen
-from typing_extensions import Annotated
-from PIL import ImageGrab
+import mss
+import numpy as np
+import cv2
+from typing import List
+from typing_extensions import Annotated, TypedDict
+from config.settings import BASE_DIR, GUI_PORT, LOG_DIR
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# pybase64 uses SIMD codecs and can return str directly; fall back to the stdlib when it isn't installed
+try:
+    from pybase64 import b64encode_as_string
+except ImportError:
+    import base64
+
+    def b64encode_as_string(data):
+        return base64.b64encode(data).decode('ascii')
+
+# orjson serializes the (large) cached transcripts several times faster than the stdlib
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj, default=str)
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj, default=str).encode()
+
+    json_loads = json.loads
+
+# Optional semantic cache for near-identical task prompts
+try:
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    faiss = None
+
+# Setup logging: records are queued and written by a background listener so tool
+# callbacks never block on log I/O. The full INFO log goes to a rotating file in LOG_DIR;
+# only warnings and errors are echoed to the console
+log_queue = queue.Queue(-1)
+file_handler = RotatingFileHandler(os.path.join(LOG_DIR, 'autogen.log'), maxBytes=5_000_000, backupCount=3)
+file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+console_handler = logging.StreamHandler()
+console_handler.setLevel(logging.WARNING)
+console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+log_listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)])
+
+# Screenshots are JPEG-encoded for speed; set AUTODEBUG_PNG=1 to get lossless PNGs when debugging
+CAPTURE_FORMAT = "png" if os.getenv("AUTODEBUG_PNG") == "1" else "jpeg"
+JPEG_QUALITY = 60
+IMAGE_MIME = {"jpeg": "image/jpeg", "png": "image/png"}
+
+# run_and_capture waits at most this long for the app to accept connections on GUI_PORT
+APP_STARTUP_TIMEOUT = 5.0
+
+# Deterministic (temperature=0) completions are cached here so reruns from any cwd reuse them
+LLM_CACHE_DIR = os.path.join(BASE_DIR, "llm_cache")
+
+# Finished sessions are indexed by prompt embedding so reworded reruns can be replayed
+SEMCACHE_INDEX = os.path.join(BASE_DIR, "semcache.faiss")
+SEMCACHE_META = os.path.join(BASE_DIR, "semcache.json")
+SEMCACHE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMCACHE_THRESHOLD = 0.92
 
 # Configuration following official docs
 config_list = [{
@@ -21,6 +94,11 @@ config_list = [{
 if not os.getenv("OPENAI_API_KEY"):
     raise ValueError("OPENAI_API_KEY environment variable is not set")
 
+# Tool schemas are sent strict (see finalize_tools) so arguments always match them. OpenAI
+# does not support strict schemas together with parallel tool calls, so the engineer
+# batches through read_files / modify_code_batch instead of several calls per turn
+STRICT_TOOLS = True
+
 # Configure OpenAI with retries
 llm_config = {
     "config_list": config_list,
@@ -28,62 +106,8 @@ llm_config = {
     "timeout": 120,
     "cache_seed": 42,
     "max_retries": 3,
-    "functions": [
-        {
-            "name": "see_file",
-            "description": "View file contents",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "File path to read"
-                    }
-                },
-                "required": ["filename"]
-            }
-        },
-        {
-            "name": "modify_code",
-            "description": "Modify code safely",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "Target file to modify"
-                    },
-                    "start_line": {
-                        "type": "integer",
-                        "description": "Start line number (1-indexed)"
-                    },
-                    "end_line": {
-                        "type": "integer",
-                        "description": "End line number (1-indexed)"
-                    },
-                    "new_code": {
-                        "type": "string",
-                        "description": "New code to insert"
-                    }
-                },
-                "required": ["filename", "start_line", "end_line", "new_code"]
-            }
-        },
-        {
-            "name": "run_and_capture",
-            "description": "Run app and analyze UI",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "filename": {
-                        "type": "string",
-                        "description": "File to run"
-                    }
-                },
-                "required": ["filename"]
-            }
-        }
-    ]
+    # Independent tool calls may share one turn only when the schemas are not strict
+    "parallel_tool_calls": not STRICT_TOOLS
 }
 
 # Configure the agents
@@ -99,14 +123,14 @@ CAPABILITIES:
 
 WORKFLOW:
 1. When asked to check code:
-   - Use see_file to view contents
+   - Use read_files to view several files in one call (see_file for a single file)
    - Analyze for issues
    - Report findings clearly
 
 2. When fixing issues:
    - Explain the problem
    - Propose specific fix
-   - Use modify_code to apply changes
+   - Use modify_code to apply changes (modify_code_batch for several edits to one file)
    - Test and verify
    - Document changes
 
@@ -121,7 +145,9 @@ WORKFLOW:
 
 Remember to use the provided tools:
 - see_file: View file contents
+- read_files: View multiple files at once
 - modify_code: Make changes
+- modify_code_batch: Make several changes to one file at once
 - run_and_capture: Test UI
 - list_dir: Check files""",
     llm_config=llm_config
@@ -140,59 +166,286 @@ Role: Coordinate with the Engineer to improve the code.
     code_execution_config={"use_docker": False}
 )
 
+# Grab the whole virtual screen with mss and encode it in one pass (no PIL image / BytesIO copy).
+# Returns the encoded buffer and its MIME type; pass format='png' for lossless debugging captures
+def capture_screen(format: str = CAPTURE_FORMAT):
+    with mss.mss() as sct:
+        monitor = sct.monitors[0]
+        # Encode straight from mss's BGRA buffer (zero-copy view); OpenCV drops the alpha
+        # channel row by row for JPEG, so no contiguous BGR copy of the frame is made
+        frame = np.asarray(sct.grab(monitor))
+    # Retina grabs come back at 2x the logical size; area-average down to logical points,
+    # which is all the vision model needs and quarters the pixels to encode and send
+    if frame.shape[1] > monitor["width"]:
+        frame = cv2.resize(frame, (monitor["width"], monitor["height"]), interpolation=cv2.INTER_AREA)
+    if format == "png":
+        ok, encoded = cv2.imencode('.png', frame)
+    elif format == "jpeg":
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    else:
+        raise ValueError(f"Unsupported screenshot format: {format}")
+    if not ok:
+        raise RuntimeError("Failed to encode screenshot")
+    return encoded, IMAGE_MIME[format]
+
+# App launched by run_and_capture; torn down before the next launch and at exit
+_app_process = None
+
+def stop_app():
+    global _app_process
+    if _app_process is not None and _app_process.poll() is None:
+        _app_process.terminate()
+        try:
+            _app_process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            _app_process.kill()
+            _app_process.wait()
+    _app_process = None
+
+atexit.register(stop_app)
+
+# Poll the app's port instead of sleeping a fixed time; False if it exits or never listens
+def wait_for_app(proc, port, timeout=APP_STARTUP_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+# clonefile(2) makes an O(1) copy-on-write clone on APFS; shutil.copyfile is the fallback
+_clonefile = None
+if sys.platform == "darwin":
+    try:
+        _clonefile = ctypes.CDLL(None, use_errno=True).clonefile
+    except (OSError, AttributeError):
+        pass
+
+def backup_file(src, dst):
+    if _clonefile is not None:
+        try:
+            os.unlink(dst)
+        except FileNotFoundError:
+            pass
+        if _clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0:
+            return
+    shutil.copyfile(src, dst)
+
+def parse_source(source, filename):
+    return compile(source, filename, "exec", ast.PyCF_ONLY_AST, dont_inherit=True)
+
+# (first line incl. decorators, last line, def column) of every function in a parsed module
+def function_spans(tree, line_offset=0, col_offset=0):
+    spans = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            spans.append((first + line_offset, node.end_lineno + line_offset, node.col_offset + col_offset))
+    spans.sort()
+    return spans
+
+# Function spans per path, reused until the file's mtime changes; modify_code stores the
+# updated spans after each write so the next edit to the same file needs no full reparse
+_span_cache = {}
+
+def cached_function_spans(filename, lines):
+    mtime_ns = os.stat(filename).st_mtime_ns
+    cached = _span_cache.get(filename)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    try:
+        spans = function_spans(parse_source("".join(lines), filename))
+    except SyntaxError:
+        spans = []
+    _span_cache[filename] = (mtime_ns, spans)
+    return spans
+
+# Validate an edit by parsing only the innermost function around it (dedented to module
+# level) and return the file's updated spans, or None when only a full parse can tell.
+# The edit must start strictly below the function's first line: an edit covering a whole
+# function can empty its parent's body, which parsing the function alone would not see
+def check_edit_locally(filename, lines, spans, start_line, end_line, new_code):
+    enclosing = None
+    for span in spans:
+        if span[0] < start_line and end_line <= span[1]:
+            enclosing = span  # spans are sorted by first line, so the last match is innermost
+    if enclosing is None or end_line < start_line:
+        return None
+    fn_start, fn_end, col = enclosing
+    indent = lines[fn_start - 1][:col]
+    new_block = new_code + "\n"
+    segment = lines[fn_start - 1:start_line - 1] + new_block.splitlines(True) + lines[end_line:fn_end]
+    dedented = []
+    for line in segment:
+        if line.strip():
+            if not line.startswith(indent):
+                return None
+            line = line[col:]
+        dedented.append(line)
+    try:
+        tree = parse_source("".join(dedented), filename)
+    except SyntaxError:
+        return None
+
+    delta = new_block.count("\n") - (end_line - start_line + 1)
+    # An ancestor ending with this function now ends where the segment's last statement
+    # does (trailing blank lines are not part of it); one ending later just shifts
+    segment_end = fn_start - 1 + tree.body[-1].end_lineno
+    updated = []
+    for first, last, column in spans:
+        if last < fn_start:
+            updated.append((first, last, column))
+        elif first > fn_end:
+            updated.append((first + delta, last + delta, column))
+        elif first <= fn_start and fn_end <= last and (first, last) != (fn_start, fn_end):
+            updated.append((first, segment_end if last == fn_end else last + delta, column))
+    updated.extend(function_spans(tree, fn_start - 1, col))
+    updated.sort()
+    return updated
+
 # Core functions following docs pattern
 @user_proxy.register_for_execution()
 @engineer.register_for_llm(description="List directory contents")
-def list_dir(directory: Annotated[str, "Directory path"]) -> tuple:
+async def list_dir(directory: Annotated[str, "Directory path"]) -> tuple:
     try:
-        logging.info(f"Listing directory: {directory}")
-        files = os.listdir(directory)
+        logging.info("Listing directory: %s", directory)
+        files = await asyncio.to_thread(os.listdir, directory)
         return 0, files
     except Exception as e:
-        logging.error(f"Error listing directory: {str(e)}")
+        logging.error("Error listing directory: %s", e)
         return 1, str(e)
 
+# Stream numbered lines into one buffer instead of building a list of f-strings
+def read_numbered(filename):
+    buf = io.StringIO()
+    write = buf.write
+    with open(filename, "r") as file:
+        for i, line in enumerate(file, 1):
+            write(str(i))
+            write(":")
+            write(line)
+    return buf.getvalue()
+
 @user_proxy.register_for_execution()
 @engineer.register_for_llm(description="View file contents")
-def see_file(filename: Annotated[str, "File path"]) -> tuple:
+async def see_file(filename: Annotated[str, "File path"]) -> tuple:
     try:
-        logging.info(f"Reading file: {filename}")
-        with open(filename, "r") as file:
-            lines = file.readlines()
-        formatted_lines = [f"{i+1}:{line}" for i, line in enumerate(lines)]
-        return 0, "".join(formatted_lines)
+        logging.info("Reading file: %s", filename)
+        return 0, await asyncio.to_thread(read_numbered, filename)
     except Exception as e:
-        logging.error(f"Error reading file: {str(e)}")
+        logging.error("Error reading file: %s", e)
         return 1, str(e)
 
+@user_proxy.register_for_execution()
+@engineer.register_for_llm(description="View multiple files")
+async def read_files(filenames: Annotated[List[str], "File paths"]) -> tuple:
+    logging.info("Reading files: %s", filenames)
+    # Reads overlap in worker threads, so N files cost about as much as the slowest one
+    results = await asyncio.gather(
+        *(asyncio.to_thread(read_numbered, filename) for filename in filenames),
+        return_exceptions=True
+    )
+    contents = {}
+    failed = False
+    for filename, result in zip(filenames, results):
+        if isinstance(result, Exception):
+            logging.error("Error reading file: %s", result)
+            contents[filename] = f"Error: {str(result)}"
+            failed = True
+        else:
+            contents[filename] = result
+    return (1 if failed else 0), contents
+
 @user_proxy.register_for_execution()
 @engineer.register_for_llm(description="Run app and analyze UI")
-def run_and_capture(filename: Annotated[str, "File to run"]) -> tuple:
+async def run_and_capture(filename: Annotated[str, "File to run"]) -> tuple:
     try:
-        logging.info(f"Running and capturing UI: {filename}")
+        logging.info("Running and capturing UI: %s", filename)
         # Run in background
-        os.system(f"python {filename} &")
-        time.sleep(5)  # Wait for startup
+        global _app_process
+        await asyncio.to_thread(stop_app)
+        _app_process = subprocess.Popen([sys.executable, filename], stdout=subprocess.DEVNULL)
+        if not await asyncio.to_thread(wait_for_app, _app_process, GUI_PORT):
+            if _app_process.poll() is not None:
+                return 1, f"App exited during startup with code {_app_process.returncode}"
+            logging.warning("App not listening on port %s after %ss, capturing anyway", GUI_PORT, APP_STARTUP_TIMEOUT)
         
         # Capture UI and convert directly to base64
-        screenshot = ImageGrab.grab()
-        import io
-        img_buffer = io.BytesIO()
-        screenshot.save(img_buffer, format='PNG')
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
+        def capture_base64():
+            encoded, mime = capture_screen()
+            return b64encode_as_string(encoded), mime
+        img_base64, mime = await asyncio.to_thread(capture_base64)
         
         return 0, {
             "status": "Running",
+            "pid": _app_process.pid,
             "image_data": {
                 "type": "image",
                 "data": img_base64,
-                "format": "base64"
+                "format": "base64",
+                "mime": mime
             }
         }
     except Exception as e:
-        logging.error(f"Error capturing UI: {str(e)}")
+        logging.error("Error capturing UI: %s", e)
         return 1, str(e)
 
+# Back up once, splice every edit bottom-up (so lower line numbers stay valid), validate, write once
+def apply_edits(filename, edits):
+    backup = f"{filename}.bak"
+    backup_file(filename, backup)
+    
+    with open(filename, "r") as file:
+        lines = file.readlines()
+    
+    edits = sorted(edits, key=lambda edit: edit["start_line"], reverse=True)
+    limit = len(lines)
+    for edit in edits:
+        start_line, end_line = edit["start_line"], edit["end_line"]
+        if not (0 < start_line <= limit and 0 < end_line <= limit):
+            return 1, "Invalid line range"
+        limit = start_line - 1  # the next (earlier) edit must end above this one
+    
+    # Each edit is checked against its enclosing function while the spans are still known;
+    # the full parse only runs when some edit could not be vouched for locally
+    spans = cached_function_spans(filename, lines)
+    for edit in edits:
+        start_line, end_line, new_code = edit["start_line"], edit["end_line"], edit["new_code"]
+        if spans is not None:
+            spans = check_edit_locally(filename, lines, spans, start_line, end_line, new_code)
+        lines[start_line - 1 : end_line] = (new_code + "\n").splitlines(True)
+    source = "".join(lines)
+    
+    # Validate (the original file is untouched until the swap below)
+    if spans is None:
+        try:
+            spans = function_spans(parse_source(source, filename))
+        except SyntaxError as e:
+            logging.error("Syntax error in changes: %s", e)
+            return 1, f"Syntax error: {str(e)}"
+    
+    # Save atomically via a sibling temp file, encoding once and writing the bytes
+    # straight to the fd (no TextIOWrapper buffering)
+    data = memoryview(source.encode("utf-8"))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)))
+    try:
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        shutil.copymode(filename, tmp_path)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _span_cache[filename] = (os.stat(filename).st_mtime_ns, spans)
+    return 0, "Modified successfully"
+
 @user_proxy.register_for_execution()
 @engineer.register_for_llm(description="Modify code safely")
 def modify_code(
@@ -202,39 +455,34 @@ def modify_code(
     new_code: Annotated[str, "New code"]
 ) -> tuple:
     try:
-        logging.info(f"Modifying file: {filename} (lines {start_line}-{end_line})")
-        # Backup
-        backup = f"{filename}.bak"
-        with open(filename, "r") as src, open(backup, "w") as dst:
-            dst.write(src.read())
-        
-        # Modify
-        with open(filename, "r") as file:
-            lines = file.readlines()
-        
-        if not (0 < start_line <= len(lines) and 0 < end_line <= len(lines)):
-            return 1, "Invalid line range"
-        
-        lines[start_line - 1 : end_line] = [new_code + "\n"]
-        
-        # Validate
-        try:
-            ast.parse("".join(lines))
-        except SyntaxError as e:
-            # Restore backup
-            with open(backup, "r") as src, open(filename, "w") as dst:
-                dst.write(src.read())
-            logging.error(f"Syntax error in changes: {str(e)}")
-            return 1, f"Syntax error: {str(e)}"
-        
-        # Save
-        with open(filename, "w") as file:
-            file.write("".join(lines))
-        
-        logging.info("Code modified successfully")
-        return 0, "Modified successfully"
+        logging.info("Modifying file: %s (lines %s-%s)", filename, start_line, end_line)
+        result = apply_edits(filename, [{"start_line": start_line, "end_line": end_line, "new_code": new_code}])
+        if result[0] == 0:
+            logging.info("Code modified successfully")
+        return result
     except Exception as e:
-        logging.error(f"Error modifying code: {str(e)}")
+        logging.error("Error modifying code: %s", e)
+        return 1, str(e)
+
+class CodeEdit(TypedDict):
+    start_line: Annotated[int, "Start line (1-indexed, in the file as it is now)"]
+    end_line: Annotated[int, "End line (1-indexed, in the file as it is now)"]
+    new_code: Annotated[str, "New code"]
+
+@user_proxy.register_for_execution()
+@engineer.register_for_llm(description="Apply several non-overlapping edits to one file at once")
+def modify_code_batch(
+    filename: Annotated[str, "Target file"],
+    edits: Annotated[List[CodeEdit], "Edits, all using line numbers of the current file"]
+) -> tuple:
+    try:
+        logging.info("Modifying file: %s (%s edits)", filename, len(edits))
+        result = apply_edits(filename, edits)
+        if result[0] == 0:
+            logging.info("Code modified successfully")
+        return result
+    except Exception as e:
+        logging.error("Error modifying code: %s", e)
         return 1, str(e)
 
 @user_proxy.register_for_execution()
@@ -244,14 +492,102 @@ def create_file_with_code(
     code: Annotated[str, "File content"]
 ) -> tuple:
     try:
-        logging.info(f"Creating file: {filename}")
+        logging.info("Creating file: %s", filename)
         with open(filename, "w") as file:
             file.write(code)
         return 0, "Created successfully"
     except Exception as e:
-        logging.error(f"Error creating file: {str(e)}")
+        logging.error("Error creating file: %s", e)
         return 1, str(e)
 
+# register_for_llm generates each tool's schema from its signature (and rebuilds the client
+# every time); mark them all strict in one pass and build the final client once
+def strict_schema(schema, defs=None):
+    # Strict mode needs every object closed, and nested $refs resolved against the root
+    defs = {**(defs or {}), **schema.pop("$defs", {})}
+    if "$ref" in schema:
+        return strict_schema(dict(defs[schema["$ref"].rsplit("/", 1)[-1]]), defs)
+    if schema.get("type") == "object":
+        schema["additionalProperties"] = False
+        schema["properties"] = {name: strict_schema(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if "items" in schema:
+        schema["items"] = strict_schema(schema["items"], defs)
+    return schema
+
+def finalize_tools(agent):
+    if STRICT_TOOLS:
+        for tool in agent.llm_config["tools"]:
+            function = tool["function"]
+            function["strict"] = True
+            function["parameters"] = strict_schema(function["parameters"])
+    agent.client = autogen.OpenAIWrapper(**agent.llm_config)
+
+finalize_tools(engineer)
+
+# 32-bit FNV-1a: a stable per-task cache seed (hash() is salted per process)
+def fnv1a(text):
+    h = 0x811c9dc5
+    for b in text.encode("utf-8"):
+        h = ((h ^ b) * 0x01000193) & 0xffffffff
+    return h
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+_embedder = None
+
+def embed_prompt(text):
+    global _embedder
+    if _embedder is None:
+        _embedder = SentenceTransformer(SEMCACHE_MODEL, device="cpu")
+    # Normalized vectors make inner product equal to cosine similarity
+    return np.asarray(_embedder.encode([text], normalize_embeddings=True), dtype="float32")
+
+# Return the transcript of a previous session whose prompt is semantically close and whose
+# target file is byte-identical; session state lives in the file, so the hash must match too
+def semcache_lookup(task_prompt, file_hash):
+    if faiss is None or not os.path.exists(SEMCACHE_INDEX):
+        return None
+    try:
+        index = faiss.read_index(SEMCACHE_INDEX)
+        with open(SEMCACHE_META, "rb") as f:
+            entries = json_loads(f.read())
+        scores, ids = index.search(embed_prompt(task_prompt), min(index.ntotal, 5))
+        for score, idx in zip(scores[0], ids[0]):
+            if idx < 0 or score < SEMCACHE_THRESHOLD:
+                break
+            if entries[idx]["file_sha256"] == file_hash:
+                logging.info("Semantic cache hit (cosine %.3f): %s", score, entries[idx]['task'])
+                return entries[idx]["messages"]
+    except Exception as e:
+        logging.error("Error reading semantic cache: %s", e)
+    return None
+
+def semcache_store(task_prompt, file_hash, messages):
+    if faiss is None:
+        return
+    try:
+        vector = embed_prompt(task_prompt)
+        if os.path.exists(SEMCACHE_INDEX):
+            index = faiss.read_index(SEMCACHE_INDEX)
+            with open(SEMCACHE_META, "rb") as f:
+                entries = json_loads(f.read())
+        else:
+            os.makedirs(BASE_DIR, exist_ok=True)
+            index = faiss.IndexFlatIP(vector.shape[1])
+            entries = []
+        index.add(vector)
+        entries.append({"task": task_prompt, "file_sha256": file_hash, "messages": messages})
+        faiss.write_index(index, SEMCACHE_INDEX)
+        with open(SEMCACHE_META, "wb") as f:
+            f.write(json_dumps(entries))
+    except Exception as e:
+        logging.error("Error updating semantic cache: %s", e)
+
 def main():
     try:
         if len(sys.argv) < 3:
@@ -265,8 +601,16 @@ def main():
             print(f"Error: {target_file} not found")
             sys.exit(1)
 
-        logging.info(f"Starting AutoGen flow for {target_file}")
-        logging.info(f"Task: {task_prompt}")
+        logging.info("Starting AutoGen flow for %s", target_file)
+        logging.info("Task: %s", task_prompt)
+
+        # Replay a finished session for a near-identical task on an unchanged file
+        cached_messages = semcache_lookup(task_prompt, file_sha256(target_file))
+        if cached_messages is not None:
+            logging.info("Replaying cached session; the file already reflects its changes")
+            for message in cached_messages:
+                print(f"{message.get('name', message.get('role'))}: {message.get('content')}")
+            return
 
         # Create task-specific message
         task_msg = f"""Let's improve {target_file}. The goal is to debug and enhance the UI until it's perfect.
@@ -300,13 +644,25 @@ REQUIRED STEPS:
 
 Start by checking the code with 'see_file {target_file}'."""
 
-        # Start direct chat between agents
-        user_proxy.initiate_chat(
-            engineer,
-            message=task_msg
-        )
+        # Start direct chat between agents; the async variant runs a turn's tool calls concurrently
+        if llm_config["temperature"] == 0:
+            # Each task gets its own reproducible cache namespace, shared by all its retries
+            with autogen.Cache.disk(cache_seed=fnv1a(task_prompt), cache_path_root=LLM_CACHE_DIR) as cache:
+                result = asyncio.run(user_proxy.a_initiate_chat(
+                    engineer,
+                    message=task_msg,
+                    cache=cache
+                ))
+        else:
+            result = asyncio.run(user_proxy.a_initiate_chat(
+                engineer,
+                message=task_msg
+            ))
+
+        # Index against the file as the session left it, so an immediate rerun is a hit
+        semcache_store(task_prompt, file_sha256(target_file), result.chat_history)
     except Exception as e:
-        logging.error(f"Error in main: {str(e)}")
+        logging.error("Error in main: %s", e)
         raise
 
 if __name__ == "__main__":
@@ -8,14 +8,17 @@ from pathlib import Path
 VERSION = "2.1"
 
 # Paths
-BASE_DIR = os.path.expanduser("~/.mac_optimizer")
-BACKUP_DIR = os.path.join(BASE_DIR, "backups")
-LOG_DIR = os.path.join(BASE_DIR, "logs")
-CONFIG_DIR = os.path.join(BASE_DIR, "config")
-
-# Create directories if they don't exist
-for directory in [BASE_DIR, BACKUP_DIR, LOG_DIR, CONFIG_DIR]:
-    Path(directory).mkdir(parents=True, exist_ok=True)
+BASE_DIR = Path.home() / ".mac_optimizer"
+BACKUP_DIR = BASE_DIR / "backups"
+LOG_DIR = BASE_DIR / "logs"
+CONFIG_DIR = BASE_DIR / "config"
+
+# Create directories if they don't exist; runs once, when this module is first imported
+def ensure_dirs():
+    for directory in (BACKUP_DIR, LOG_DIR, CONFIG_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+ensure_dirs()
 
 # Feature flags
 ENABLE_ADVANCED_FEATURES = True
@@ -5,11 +5,35 @@ import re
 import platform
 import shutil
 import time
+import functools
+import ctypes
+import shlex
+import glob
+import concurrent.futures
+import threading
+import contextvars
+import itertools
+from collections import OrderedDict, deque
+from types import MappingProxyType
 from nicegui import ui, app
-from typing import List, Tuple
+import aiofiles
+import aiofiles.os
+from typing import List, Optional, Tuple
 import asyncio
 import logging
 import sys
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+try:
+    import psutil
+except ImportError:
+    psutil = None
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import PatternMatchingEventHandler
+except ImportError:
+    Observer = None
 BASE_DIR = os.path.expanduser("~/.mac_optimizer")
 BACKUP_DIR = os.path.join(BASE_DIR, "backups", datetime.datetime.now().strftime("%Y%m%d_%H%M%S"))
 LOG_FILE = os.path.join(BACKUP_DIR, "optimizer.log")
@@ -31,6 +55,42 @@ SCHEDULE_FILE = os.path.join(BASE_DIR, "schedule")
 USAGE_PROFILE = os.path.join(BASE_DIR, "usage")
 AUTO_BACKUP_LIMIT = 5
 LAST_RUN_FILE = os.path.join(BASE_DIR, "lastrun")
+# System monitor refresh period and how long each metric's sample is reused (seconds)
+STATUS_INTERVAL = 2.0
+STATUS_TTL = {'cpu': 1.0, 'memory': 2.0, 'disk': 5.0}
+# Identical notifications within this many seconds are coalesced; at most
+# MAX_ACTIVE_NOTIFICATIONS distinct ones are tracked at a time
+NOTIFICATION_WINDOW = 5.0
+MAX_ACTIVE_NOTIFICATIONS = 5
+# An optimization still running after this many seconds is cancelled
+OPTIMIZATION_TIMEOUT = 300
+# A sudo password prompt left unanswered this long is killed; a successful check is
+# trusted for SUDO_REVALIDATE seconds before sudo is asked again
+SUDO_PROMPT_TIMEOUT = 60
+SUDO_REVALIDATE = 60.0
+# Notification history kept for the notifications dialog and activity feed
+MAX_NOTIFICATIONS = 200
+
+# Static UI tables, built once at import. (page, label, icon) for the navigation drawer
+MENU_ITEMS = (
+    ('dashboard', 'Dashboard', 'dashboard'),
+    ('optimizations', 'Optimizations', 'tune'),
+    ('logs', 'System Logs', 'article'),
+    ('settings', 'Settings', 'settings'),
+)
+# (attribute, label, icon) for each system monitor card
+SYSTEM_MONITORS = (
+    ('cpu_progress', 'CPU Usage', 'speed'),
+    ('memory_progress', 'Memory Usage', 'memory'),
+    ('disk_progress', 'Disk Usage', 'storage'),
+)
+# (icon, theme color) for each notification type, unpacked in a single lookup
+NOTIFICATION_STYLES = MappingProxyType({
+    'info': ('info', 'info'),
+    'success': ('check_circle', 'positive'),
+    'warning': ('warning', 'warning'),
+    'error': ('error', 'negative'),
+})
 async def show_notifications(self):
     "com.apple.dock",
     "com.apple.finder",
@@ -46,13 +106,47 @@ MACOS_VERSION = ""
 MACOS_BUILD = ""
 ARCH = platform.machine()
 
+# System probes fork a child process each; cache the output so every command runs at
+# most once. Call .cache_clear() after a change that needs to be measured again.
+@functools.lru_cache(maxsize=None)
+def _sp_displays() -> str:
+    return subprocess.run(["system_profiler", "SPDisplaysDataType"], capture_output=True, text=True, check=False).stdout
+
+@functools.lru_cache(maxsize=None)
+def _sw_vers(flag: str) -> str:
+    return subprocess.run(["sw_vers", flag], capture_output=True, text=True, check=False).stdout.strip()
+
+# Integer sysctls are read in-process with sysctlbyname(3) rather than by running sysctl
+try:
+    _libc = ctypes.CDLL("libSystem.dylib", use_errno=True)
+except OSError:
+    _libc = None
+
+def sysctl_int(name: str) -> Optional[int]:
+    if _libc is None:
+        return None
+    value = ctypes.c_int64(0)
+    size = ctypes.c_size_t(ctypes.sizeof(value))
+    if _libc.sysctlbyname(name.encode(), ctypes.byref(value), ctypes.byref(size), None, 0) != 0:
+        return None
+    # Most integer sysctls are 32-bit; reinterpret so negative values keep their sign
+    if size.value == 4:
+        return ctypes.c_int32(value.value & 0xFFFFFFFF).value
+    return value.value
+
+_which = functools.lru_cache(maxsize=None)(shutil.which)
+
+# GPU_INFO is resolved on first access instead of at import
+def __getattr__(name: str):
+    if name == "GPU_INFO":
+        return _sp_displays()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # Check if system_profiler is available
-if shutil.which("system_profiler") is None:
+if _which("system_profiler") is None:
     print("system_profiler command not found. This script requires macOS.")
     exit(1)
 
-GPU_INFO = subprocess.getoutput("system_profiler SPDisplaysDataType 2>/dev/null")
-
 # Color definitions
 GREEN = '\033[1;32m'
 RED = '\033[0;31m'
@@ -70,25 +164,45 @@ UNDERLINE = '\033[4m'
 if ARCH == "arm64":
     IS_APPLE_SILICON = True
 elif ARCH == "x86_64":
-    try:
-        if int(subprocess.getoutput("sysctl -n sysctl.proc_translated")) > 0:
-            IS_ROSETTA = True
-            IS_APPLE_SILICON = True
-    except:
-        pass
+    if (sysctl_int("sysctl.proc_translated") or 0) > 0:
+        IS_ROSETTA = True
+        IS_APPLE_SILICON = True
+
+# Keep only the numeric part of the product version (e.g. a beta suffix is dropped)
+_version_match = re.match(r"\d+(?:\.\d+)*", _sw_vers("-productVersion"))
+MACOS_VERSION = _version_match.group(0) if _version_match else ""
+MACOS_BUILD = _sw_vers("-buildVersion")
+
+# Enhanced logging: lines are queued and written by a background listener to a log file
+# that rotates at 1 MiB, so callers never wait on file I/O
+class _SecondCachedFormatter(logging.Formatter):
+    """Formatter that reuses the timestamp string for records within the same second"""
+    _last_second = None
+    _last_timestamp = ""
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_timestamp = time.strftime(datefmt or '%Y-%m-%d %H:%M:%S', self.converter(second))
+        return self._last_timestamp
+
+# LOG_FILE lives in BACKUP_DIR, so this creates the backup directory once for the whole run
+os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+_log_queue = queue.Queue(-1)
+_log_handler = RotatingFileHandler(LOG_FILE, maxBytes=1 << 20, backupCount=1)
+_log_handler.setFormatter(_SecondCachedFormatter('[%(asctime)s]%(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logger = logging.getLogger("optimizer")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(QueueHandler(_log_queue))
+_LOG_LEVELS = {"ERROR": logging.ERROR, "WARNING": logging.WARNING}
 
-MACOS_VERSION = subprocess.getoutput("sw_vers -productVersion").replace("a", "").replace("b", "").replace("c", "").replace("d", "").replace("e", "").replace("f", "").replace("g", "").replace("h", "").replace("i", "").replace("j", "").replace("k", "").replace("l", "").replace("m", "").replace("n", "").replace("o", "").replace("p", "").replace("q", "").replace("r", "").replace("s", "").replace("t", "").replace("u", "").replace("v", "").replace("w", "").replace("x", "").replace("y", "").replace("z", "")
-MACOS_BUILD = subprocess.getoutput("sw_vers -buildVersion")
-
-# Enhanced logging
 def enhanced_logging(severity: str, message: str, log_file: str = LOG_FILE):
-    log_dir = os.path.dirname(LOG_FILE)
-    os.makedirs(log_dir, exist_ok=True)
-    if os.path.exists(LOG_FILE) and os.stat(LOG_FILE).st_size > 1048576:
-        shutil.move(LOG_FILE, LOG_FILE + ".old")
-    timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open(LOG_FILE, "a") as f:
-        f.write(f"[{timestamp}][{severity}] {message}\n")
+    logger.log(_LOG_LEVELS.get(severity, logging.INFO), "[%s] %s", severity, message)
     print(f"{GRAY}[{severity}] {message}{NC}")
 
 def log(message: str):
@@ -118,15 +232,43 @@ def handle_error(error_msg: str, error_code: int = 1):
         warning("Unknown error occurred")
     return error_code
 
+# Page counters from vm_stat output ("Pages <kind>: <count>."), read in a single pass
+def parse_vm_stat(output: str) -> dict:
+    pages = {}
+    for line in output.splitlines():
+        if line.startswith("Pages "):
+            key, _, value = line.partition(":")
+            pages[key] = int(value.strip().rstrip('.'))
+    return pages
+
+# Last vm_stat sample (monotonic time, page counters), shared by memory_pressure and the
+# system monitor so vm_stat runs at most once per STATUS_TTL['memory'] between them
+_vm_sample = [0.0, None]
+
+def cached_vm_sample() -> Optional[dict]:
+    taken, pages = _vm_sample
+    if pages is not None and time.monotonic() - taken < STATUS_TTL['memory']:
+        return pages
+    return None
+
+def store_vm_sample(output: str) -> dict:
+    pages = parse_vm_stat(output)
+    _vm_sample[:] = [time.monotonic(), pages]
+    return pages
+
 # Memory pressure check
 def memory_pressure() -> Tuple[str, int]:
-    print(f"{RED}Error: {error_msg} (Code: {error_code}){NC}")
-    log(f"ERROR: {error_msg} (Code: {error_code})")
-        memory_stats = subprocess.getoutput("vm_stat")
-        active = int(next(line.split()[2].replace('.', '') for line in memory_stats.splitlines() if "Pages active" in line))
-        wired = int(next(line.split()[3].replace('.', '') for line in memory_stats.splitlines() if "Pages wired" in line))
-        compressed = int(next(line.split()[4].replace('.', '') for line in memory_stats.splitlines() if "Pages occupied by compressor" in line))
-        free = int(next(line.split()[2].replace('.', '') for line in memory_stats.splitlines() if "Pages free" in line))
+    # psutil reads host_statistics64 in-process; vm_stat is only needed without it
+    if psutil is not None:
+        return f"System memory pressure: {int(psutil.virtual_memory().percent)}", 0
+    try:
+        pages = cached_vm_sample()
+        if pages is None:
+            pages = store_vm_sample(subprocess.run(["vm_stat"], capture_output=True, text=True, check=False).stdout)
+        active = pages["Pages active"]
+        wired = pages["Pages wired down"]
+        compressed = pages["Pages occupied by compressor"]
+        free = pages["Pages free"]
         used = active + wired + compressed
         total = used + free
         percentage = (used * 100) // total
@@ -160,9 +302,10 @@ def verify_system_state() -> bool:
 
     # CPU thermal check
     print("Checking CPU temperature...", end="")
-    if subprocess.run(["sysctl", "machdep.xcpm.cpu_thermal_level"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode != 0:
+    thermal_level = sysctl_int("machdep.xcpm.cpu_thermal_level")
+    if thermal_level is None:
         print(f" {YELLOW}⚠{NC} (Not available)")
-    elif "1" in subprocess.getoutput("sysctl machdep.xcpm.cpu_thermal_level"):
+    elif thermal_level > 0:
         issues.append("CPU thermal throttling detected")
         checks_passed = False
         print(f" {RED}✗{NC}")
@@ -185,27 +328,40 @@ def version_compare(v1: str, v2: str) -> int:
     return 0
 
 # Cleanup function
+# Runs once, at exit; later calls are no-ops
+_cleaned_up = False
+
 def cleanup():
+    global _cleaned_up
+    if _cleaned_up:
+        return
+    _cleaned_up = True
     print(f"\n{GRAY}Cleaning up...{NC}")
     subprocess.run(["tput", "cnorm"], check=False, stderr=subprocess.DEVNULL)
     temp_files = [
         "/tmp/mac_optimizer_temp",
         "/tmp/mac_optimizer_cleanup",
-        "/private/tmp/mac_optimizer_*"
+        *glob.iglob("/private/tmp/mac_optimizer_*")
     ]
     for file in temp_files:
         if os.path.exists(file):
             try:
-                shutil.rmtree(file)
+                if os.path.isdir(file):
+                    shutil.rmtree(file)
+                else:
+                    os.remove(file)
             except:
                 warning(f"Failed to remove {file}")
-    subprocess.run(["killall", "System Preferences"], check=False, stderr=subprocess.DEVNULL)
+    processes = ["System Preferences"]
     if os.path.exists("/tmp/mac_optimizer_ui_modified"):
-        subprocess.run(["killall", "Finder", "Dock"], check=False, stderr=subprocess.DEVNULL)
+        processes += ["Finder", "Dock"]
         try:
             os.remove("/tmp/mac_optimizer_ui_modified")
         except:
             pass
+    subprocess.run(["killall", *processes], check=False, stderr=subprocess.DEVNULL)
+
+atexit.register(cleanup)
 
 # System requirements check
 def check_system_requirements():
@@ -239,13 +395,94 @@ def show_spinner(message: str, pid: int):
     spin = '-\|/'
     i = 0
     while True:
-        if subprocess.run(["kill", "-0", str(pid)], stderr=subprocess.DEVNULL).returncode != 0:
+        # Signal 0 only checks that the process exists
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
             break
+        except PermissionError:
+            pass
         print(f"\r{CYAN}{spin[i % 4]}{NC} {message}...", end="")
         time.sleep(0.1)
         i += 1
     print(f"\r{GREEN}✓{NC} {message}... Done")
 
+# Shells started by run_batched, so a cancelled or timed-out optimization can stop them.
+_running_procs = set()
+
+# Each optimization run has its own cancel token (see start_run). The blocking helpers
+# read it from a context variable, which worker threads inherit through copy_context,
+# so cancelling one run never un-cancels a worker abandoned by an earlier one
+_NOT_CANCELLED = threading.Event()
+_run_cancel = contextvars.ContextVar("run_cancel", default=_NOT_CANCELLED)
+
+def start_run() -> threading.Event:
+    token = threading.Event()
+    _run_cancel.set(token)
+    return token
+
+def run_cancelled() -> bool:
+    return _run_cancel.get().is_set()
+
+# Once a run's token is set, its further batches fail fast
+def cancel_running(token: Optional[threading.Event] = None):
+    if token is not None:
+        token.set()
+    for proc in list(_running_procs):
+        proc.terminate()
+
+# Sections run concurrently (see optimize_all), so only one thread at a time may let sudo
+# prompt on the terminal; once it has cached credentials the others go through unprompted
+_sudo_lock = threading.Lock()
+_sudo_checked = [0.0]
+
+# Returns whether sudo credentials are cached. The prompt is registered like any other
+# child so cancel_running() can kill it, and is given up after SUDO_PROMPT_TIMEOUT
+def ensure_sudo() -> bool:
+    with _sudo_lock:
+        if run_cancelled():
+            return False
+        if time.monotonic() - _sudo_checked[0] < SUDO_REVALIDATE:
+            return True
+        proc = subprocess.Popen(["sudo", "-v"])
+        _running_procs.add(proc)
+        try:
+            code = proc.wait(timeout=SUDO_PROMPT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            return False
+        finally:
+            _running_procs.discard(proc)
+        if code == 0:
+            _sudo_checked[0] = time.monotonic()
+        return code == 0
+
+# Run a group of commands through one shell (and one sudo prompt/fork) instead of one
+# process per command; returns each command's exit status in order
+def run_batched(cmds: List[List[str]], sudo: bool = True) -> List[int]:
+    if not cmds:
+        return []
+    if run_cancelled():
+        return [1] * len(cmds)
+    script = " ; ".join(f"{shlex.join(cmd)} >/dev/null 2>&1 ; echo __RC_{i}__$?" for i, cmd in enumerate(cmds))
+    if sudo and not ensure_sudo():
+        return [1] * len(cmds)
+    # -n: credentials were just checked, so never fall back to a second (unkillable) prompt
+    argv = ["sudo", "-n", "sh", "-c", script] if sudo else ["sh", "-c", script]
+    proc = subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    _running_procs.add(proc)
+    try:
+        output, _ = proc.communicate()
+    finally:
+        _running_procs.discard(proc)
+    codes = {}
+    for line in output.splitlines():
+        if line.startswith("__RC_"):
+            index, _, code = line[len("__RC_"):].partition("__")
+            codes[int(index)] = int(code)
+    return [codes.get(i, 1) for i in range(len(cmds))]
+
 # System performance optimization
 def optimize_system_performance():
     log("Starting system performance optimization")
@@ -254,8 +491,6 @@ def optimize_system_performance():
     total_steps = 12
     current_step = 0
 
-    # 1. Kernel Parameter Optimization
-    print(f"\n{BOLD}1. Kernel Parameter Optimization:{NC}")
     sysctl_params = [
         "kern.maxvnodes=750000",
         "kern.maxproc=4096",
@@ -264,56 +499,75 @@ def optimize_system_performance():
         "kern.ipc.maxsockbuf=8388608",
         "kern.ipc.nmbclusters=65536",
     ]
-    for param in sysctl_params:
+    network_params = [
+        "net.inet.tcp.delayed_ack=0",
+        "net.inet.tcp.mssdflt=1440",
+        "net.inet.tcp.win_scale_factor=8",
+        "net.inet.tcp.sendspace=524288",
+        "net.inet.tcp.recvspace=524288",
+    ]
+    # Prepend serverperfmode=1 to the existing boot-args ("boot-args\t<args>")
+    current = subprocess.run(["nvram", "boot-args"], capture_output=True, text=True, check=False).stdout
+    current_args = current.split("\t", 1)[1].strip() if "\t" in current else ""
+    if "serverperfmode=1" not in current_args.split():
+        current_args = f"serverperfmode=1 {current_args}".strip()
+
+    # Every privileged write in this section goes through one sudo batch; the steps below
+    # only report the per-command results
+    codes = run_batched(
+        [["sysctl", "-w", param] for param in sysctl_params]
+        + [["pmset", "-a", "highperf", "1"], ["nvram", f"boot-args={current_args}"]]
+        + [["sysctl", "-w", param] for param in network_params]
+    )
+    sysctl_codes = codes[:len(sysctl_params)]
+    pmset_code, nvram_code = codes[len(sysctl_params):len(sysctl_params) + 2]
+    network_codes = codes[len(sysctl_params) + 2:]
+
+    # 1. Kernel Parameter Optimization
+    print(f"\n{BOLD}1. Kernel Parameter Optimization:{NC}")
+    for param, code in zip(sysctl_params, sysctl_codes):
         current_step += 1
         print(f"  {HOURGLASS} Setting {param}...", end="")
-        if subprocess.run(["sudo", "sysctl", "-w", param], stderr=subprocess.DEVNULL).returncode == 0:
+        if code == 0:
             changes_made.append(f"Kernel parameter {param} set")
             print(f"\r  {GREEN}✓{NC} {param} applied")
         else:
             print(f"\r  {RED}✗{NC} Failed to set {param}")
-        show_progress(current_step, total_steps)
+        track_progress_no_dialog(current_step, total_steps, "")
 
     # 2. Performance Mode Settings
     print(f"\n{BOLD}2. Performance Mode Settings:{NC}")
     current_step += 1
     print(f"  {HOURGLASS} Setting maximum performance mode...", end="")
-    if subprocess.run(["sudo", "pmset", "-a", "highperf", "1"], stderr=subprocess.DEVNULL).returncode == 0:
+    if pmset_code == 0:
         changes_made.append("High performance mode enabled")
         print(f"\r  {GREEN}✓{NC} Maximum performance mode set")
     else:
         print(f"\r  {RED}✗{NC} Failed to set performance mode")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     # 3. CPU and Memory Optimization
     print(f"\n{BOLD}3. CPU and Memory Optimization:{NC}")
     current_step += 1
     print(f"  {HOURGLASS} Optimizing CPU settings...", end="")
-    if subprocess.run(["sudo", "nvram", "boot-args=serverperfmode=1 $(nvram boot-args 2>/dev/null | cut -f 2-)"], shell=True, stderr=subprocess.DEVNULL).returncode == 0:
+    if nvram_code == 0:
         changes_made.append("CPU server performance mode enabled")
         print(f"\r  {GREEN}✓{NC} CPU optimization applied")
     else:
         print(f"\r  {RED}✗{NC} Failed to optimize CPU settings")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     # 4. Network Stack Optimization
     print(f"\n{BOLD}4. Network Stack Optimization:{NC}")
-    network_params = [
-        "net.inet.tcp.delayed_ack=0",
-        "net.inet.tcp.mssdflt=1440",
-        "net.inet.tcp.win_scale_factor=8",
-        "net.inet.tcp.sendspace=524288",
-        "net.inet.tcp.recvspace=524288",
-    ]
-    for param in network_params:
+    for param, code in zip(network_params, network_codes):
         current_step += 1
         print(f"  {HOURGLASS} Setting {param}...", end="")
-        if subprocess.run(["sudo", "sysctl", "-w", param], stderr=subprocess.DEVNULL).returncode == 0:
+        if code == 0:
             changes_made.append(f"Network parameter {param} set")
             print(f"\r  {GREEN}✓{NC} {param} applied")
         else:
             print(f"\r  {RED}✗{NC} Failed to set {param}")
-        show_progress(current_step, total_steps)
+        track_progress_no_dialog(current_step, total_steps, "")
 
     # Summary
     print(f"\n{CYAN}Optimization Summary:{NC}")
@@ -324,103 +578,135 @@ def optimize_system_performance():
     success(f"System performance optimization completed with {len(changes_made)} improvements")
     return 0
 
-# Progress bar function
-def show_progress(percent: int, message: str = ''):
-    width = 30
-    completed = (width * percent) // 100
-    remaining = width - completed
-    print(f"\r{CYAN}[{'█' * completed}{'░' * remaining}]{NC} {percent:3}% {message}", end="")
+# Progress updates are sent at most every PROGRESS_INTERVAL seconds; the final
+# (current == total) one is always sent
+PROGRESS_INTERVAL = 0.05
+_last_progress_draw = [0.0]
 
-# Progress tracking for optimizations (without dialog dependency)
-def track_progress_no_dialog(step: int, total: int, message: str):
-    percent = (step * 100) // total
-    width = 50
-    filled = (width * step) // total
-    empty = width - filled
-    print(f"\r  {GRAY}[{GREEN}{'█' * filled}{GRAY}{'░' * empty}] {BOLD}{percent:3}%{NC} {message}", end="")
+def _progress_due(done: bool) -> bool:
+    now = time.monotonic()
+    if not done and now - _last_progress_draw[0] < PROGRESS_INTERVAL:
+        return False
+    _last_progress_draw[0] = now
+    return True
+
+# Optimizers report progress from worker threads; the UI registers a sink that moves
+# (fraction, message) onto its progress bar from the event loop
+_progress_sink = None
+
+def set_progress_sink(sink):
+    global _progress_sink
+    _progress_sink = sink
+
+def report_progress(current: int, total: int, message: str = ''):
+    if _progress_sink is None or not _progress_due(current >= total):
+        return
+    _progress_sink(current / total, message)
 
 # Graphics optimization
-def optimize_graphics():
+def optimize_graphics(backup: bool = True):
     log("Starting graphics optimization")
     print(f"\n{CYAN}Detailed Graphics Optimization Progress:{NC}")
     changes_made = []
     total_steps = 15
     current_step = 0
 
-    # Create backup before making changes
-    backup_graphics_settings()
+    # Create backup before making changes (optimize_all takes it once up front instead)
+    if backup:
+        backup_graphics_settings()
+
+    # System-wide writes go through one sudo batch; the per-user writes for the steps
+    # that succeed are collected and applied in one batch before the UI restart
+    (drawing, gpu, resize, dock_time, dock_delay, metal, iop) = run_batched([
+        ["defaults", "write", "/Library/Preferences/com.apple.windowserver", "UseOptimizedDrawing", "-bool", "true"],
+        ["defaults", "write", "com.apple.WindowServer", "MaximumGPUMemory", "-int", "4096"],
+        ["defaults", "write", "-g", "NSWindowResizeTime", "-float", "0.001"],
+        ["defaults", "write", "com.apple.dock", "autohide-time-modifier", "-float", "0.0"],
+        ["defaults", "write", "com.apple.dock", "autohide-delay", "-float", "0.0"],
+        ["defaults", "write", "/Library/Preferences/com.apple.CoreDisplay", "useMetal", "-bool", "true"],
+        ["defaults", "write", "/Library/Preferences/com.apple.CoreDisplay", "useIOP", "-bool", "true"],
+    ])
+    user_cmds = []
 
     # 1. Window Server Optimizations
     print(f"\n{BOLD}1. Window Server Optimizations:{NC}")
     current_step += 1
     print(f"  {HOURGLASS} Optimizing drawing performance...", end="")
-    if subprocess.run(["sudo", "defaults", "write", "/Library/Preferences/com.apple.windowserver", "UseOptimizedDrawing", "-bool", "true"], stderr=subprocess.DEVNULL).returncode == 0:
-        subprocess.run(["defaults", "write", "com.apple.WindowServer", "UseOptimizedDrawing", "-bool", "true"], stderr=subprocess.DEVNULL)
-        subprocess.run(["defaults", "write", "com.apple.WindowServer", "Accelerate", "-bool", "true"], stderr=subprocess.DEVNULL)
-        subprocess.run(["defaults", "write", "com.apple.WindowServer", "EnableHiDPI", "-bool", "true"], stderr=subprocess.DEVNULL)
+    if drawing == 0:
+        user_cmds += [
+            ["defaults", "write", "com.apple.WindowServer", "UseOptimizedDrawing", "-bool", "true"],
+            ["defaults", "write", "com.apple.WindowServer", "Accelerate", "-bool", "true"],
+            ["defaults", "write", "com.apple.WindowServer", "EnableHiDPI", "-bool", "true"],
+        ]
         changes_made.append("Drawing optimization enabled")
         print(f"\r  {GREEN}✓{NC} Drawing performance optimized")
     else:
         print(f"\r  {RED}✗{NC} Failed to optimize drawing performance")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     # 2. GPU Settings
     print(f"\n{BOLD}2. GPU Settings:{NC}")
     current_step += 1
     print(f"  {HOURGLASS} Optimizing GPU performance...", end="")
-    if subprocess.run(["sudo", "defaults", "write", "com.apple.WindowServer", "MaximumGPUMemory", "-int", "4096"], stderr=subprocess.DEVNULL).returncode == 0:
-        subprocess.run(["defaults", "write", "com.apple.WindowServer", "GPUPowerPolicy", "-string", "maximum"], stderr=subprocess.DEVNULL)
-        subprocess.run(["defaults", "write", "com.apple.WindowServer", "DisableGPUProcessing", "-bool", "false"], stderr=subprocess.DEVNULL)
+    if gpu == 0:
+        user_cmds += [
+            ["defaults", "write", "com.apple.WindowServer", "GPUPowerPolicy", "-string", "maximum"],
+            ["defaults", "write", "com.apple.WindowServer", "DisableGPUProcessing", "-bool", "false"],
+        ]
         changes_made.append("GPU performance maximized")
         print(f"\r  {GREEN}✓{NC} GPU settings optimized")
     else:
         print(f"\r  {RED}✗{NC} Failed to optimize GPU settings")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     # 3. Animation and Visual Effects
     print(f"\n{BOLD}3. Animation and Visual Effects:{NC}")
     current_step += 1
     print(f"  {HOURGLASS} Optimizing window animations...", end="")
-    if subprocess.run(["sudo", "defaults", "write", "-g", "NSWindowResizeTime", "-float", "0.001"], stderr=subprocess.DEVNULL).returncode == 0:
-        subprocess.run(["defaults", "write", "-g", "NSAutomaticWindowAnimationsEnabled", "-bool", "true"], stderr=subprocess.DEVNULL)
-        subprocess.run(["defaults", "write", "-g", "NSWindowResizeTime", "-float", "0.001"], stderr=subprocess.DEVNULL)
+    if resize == 0:
+        user_cmds += [
+            ["defaults", "write", "-g", "NSAutomaticWindowAnimationsEnabled", "-bool", "true"],
+            ["defaults", "write", "-g", "NSWindowResizeTime", "-float", "0.001"],
+        ]
         changes_made.append("Window animations optimized")
         print(f"\r  {GREEN}✓{NC} Window animations optimized")
     else:
         print(f"\r  {RED}✗{NC} Failed to optimize window animations")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     current_step += 1
     print(f"  {HOURGLASS} Adjusting dock animations...", end="")
-    if subprocess.run(["sudo", "defaults", "write", "com.apple.dock", "autohide-time-modifier", "-float", "0.0"], stderr=subprocess.DEVNULL).returncode == 0 and \
-       subprocess.run(["sudo", "defaults", "write", "com.apple.dock", "autohide-delay", "-float", "0.0"], stderr=subprocess.DEVNULL).returncode == 0:
-        subprocess.run(["defaults", "write", "com.apple.dock", "autohide-time-modifier", "-float", "0.0"], stderr=subprocess.DEVNULL)
-        subprocess.run(["defaults", "write", "com.apple.dock", "autohide-delay", "-float", "0.0"], stderr=subprocess.DEVNULL)
+    if dock_time == 0 and dock_delay == 0:
+        user_cmds += [
+            ["defaults", "write", "com.apple.dock", "autohide-time-modifier", "-float", "0.0"],
+            ["defaults", "write", "com.apple.dock", "autohide-delay", "-float", "0.0"],
+        ]
         changes_made.append("Dock animations optimized")
         print(f"\r  {GREEN}✓{NC} Dock animations adjusted")
     else:
         print(f"\r  {RED}✗{NC} Failed to adjust dock animations")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     # 4. Metal Performance
     print(f"\n{BOLD}4. Metal Performance:{NC}")
     current_step += 1
     print(f"  {HOURGLASS} Optimizing Metal performance...", end="")
-    if subprocess.run(["sudo", "defaults", "write", "/Library/Preferences/com.apple.CoreDisplay", "useMetal", "-bool", "true"], stderr=subprocess.DEVNULL).returncode == 0 and \
-       subprocess.run(["sudo", "defaults", "write", "/Library/Preferences/com.apple.CoreDisplay", "useIOP", "-bool", "true"], stderr=subprocess.DEVNULL).returncode == 0:
-        subprocess.run(["defaults", "write", "NSGlobalDomain", "MetalForceHardwareRenderer", "-bool", "true"], stderr=subprocess.DEVNULL)
-        subprocess.run(["defaults", "write", "NSGlobalDomain", "MetalLoadingPriority", "-string", "High"], stderr=subprocess.DEVNULL)
+    if metal == 0 and iop == 0:
+        user_cmds += [
+            ["defaults", "write", "NSGlobalDomain", "MetalForceHardwareRenderer", "-bool", "true"],
+            ["defaults", "write", "NSGlobalDomain", "MetalLoadingPriority", "-string", "High"],
+        ]
         changes_made.append("Metal performance optimized")
         print(f"\r  {GREEN}✓{NC} Metal performance optimized")
     else:
         print(f"\r  {RED}✗{NC} Failed to optimize Metal performance")
-    show_progress(current_step, total_steps)
+    track_progress_no_dialog(current_step, total_steps, "")
 
     # Force kill all UI processes to apply changes
+    run_batched(user_cmds, sudo=False)
+
     print(f"\n{HOURGLASS} Applying all changes (this may cause a brief screen flicker)...", end="")
-    subprocess.run(["sudo", "killall", "Dock"], stderr=subprocess.DEVNULL)
-    subprocess.run(["sudo", "killall", "Finder"], stderr=subprocess.DEVNULL)
-    subprocess.run(["sudo", "killall", "SystemUIServer"], stderr=subprocess.DEVNULL)
+    subprocess.run(["sudo", "killall", "Dock", "Finder", "SystemUIServer"], stderr=subprocess.DEVNULL)
     print(f"\r{GREEN}✓{NC} All changes applied")
 
     # Summary
@@ -438,10 +724,19 @@ def optimize_graphics():
 # Helper function to backup graphics settings
 def backup_graphics_settings():
     backup_file = os.path.join(BACKUP_DIR, f"graphics_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}")
-    subprocess.run(["defaults", "export", "com.apple.WindowServer", f"{backup_file}.windowserver"], check=False, stderr=subprocess.DEVNULL)
-    subprocess.run(["defaults", "export", "com.apple.dock", f"{backup_file}.dock"], check=False, stderr=subprocess.DEVNULL)
-    subprocess.run(["defaults", "export", "com.apple.finder", f"{backup_file}.finder"], check=False, stderr=subprocess.DEVNULL)
-    subprocess.run(["defaults", "export", "NSGlobalDomain", f"{backup_file}.global"], check=False, stderr=subprocess.DEVNULL)
+    # Copy the preference plists directly instead of running `defaults export` per domain
+    prefs_dir = os.path.expanduser("~/Library/Preferences")
+    plists = {
+        "com.apple.WindowServer.plist": "windowserver",
+        "com.apple.dock.plist": "dock",
+        "com.apple.finder.plist": "finder",
+        ".GlobalPreferences.plist": "global",
+    }
+    for plist, suffix in plists.items():
+        try:
+            shutil.copyfile(os.path.join(prefs_dir, plist), f"{backup_file}.{suffix}")
+        except OSError:
+            pass
     with open(os.path.join(BACKUP_DIR, "last_graphics_backup"), "w") as f:
         f.write(backup_file)
     log(f"Graphics settings backed up to {backup_file}")
@@ -482,55 +777,93 @@ echo "Settings restored to defaults"
     os.chmod(recovery_script, 0o755)
     log(f"Recovery script created at {recovery_script}")
 
+# First Resolution/Depth values in a system_profiler SPDisplaysDataType report
+def _display_fields(report: str) -> Tuple[str, str]:
+    resolution = depth = None
+    for line in report.splitlines():
+        line = line.strip()
+        if resolution is None and line.startswith("Resolution:"):
+            resolution = line.split(": ", 1)[1]
+        elif depth is None and line.startswith("Depth:"):
+            depth = line.split(": ", 1)[1]
+    return resolution or "N/A", depth or "N/A"
+
 # Display optimization
 def optimize_display():
     log("Starting display optimization")
     print("\n")
     print(f"{BOLD}{CYAN}Display Optimization{NC}")
     print(f"{DIM}Optimizing display settings for better performance...{NC}\n")
-    os.makedirs(BACKUP_DIR, exist_ok=True)
-    subprocess.run(["system_profiler", "SPDisplaysDataType"], stdout=open(f"{MEASUREMENTS_FILE}.before", "w"), check=False)
+    # The cached snapshot may be an earlier run's "after" (or predate a monitor or
+    # resolution change), so take a fresh "before"
+    _sp_displays.cache_clear()
+    display_info = _sp_displays()
+    with open(f"{MEASUREMENTS_FILE}.before", "w") as f:
+        f.write(display_info)
     total_steps = 5
     current_step = 0
     changes_made = []
-    display_info = subprocess.getoutput("system_profiler SPDisplaysDataType")
     is_retina = "retina" in display_info.lower()
     is_scaled = "scaled" in display_info.lower()
 
+    # All display defaults are system writes; apply them in one sudo batch up front
+    if is_retina:
+        resolution_cmds = [
+            ["defaults", "write", "NSGlobalDomain", "AppleFontSmoothing", "-int", "0"],
+            ["defaults", "write", "NSGlobalDomain", "CGFontRenderingFontSmoothingDisabled", "-bool", "true"],
+        ]
+    else:
+        resolution_cmds = [["defaults", "write", "NSGlobalDomain", "AppleFontSmoothing", "-int", "1"]]
+    color_cmds = [
+        ["defaults", "write", "NSGlobalDomain", "AppleICUForce24HourTime", "-bool", "true"],
+        ["defaults", "write", "NSGlobalDomain", "AppleDisplayScaleFactor", "-int", "1"],
+    ]
+    font_cmds = [
+        ["defaults", "write", "NSGlobalDomain", "AppleFontSmoothing", "-int", "1"],
+        ["defaults", "write", "-g", "CGFontRenderingFontSmoothingDisabled", "-bool", "NO"],
+    ]
+    screen_cmds = [
+        ["defaults", "write", "com.apple.CrashReporter", "DialogType", "none"],
+        ["defaults", "write", "com.apple.screencapture", "disable-shadow", "-bool", "true"],
+    ]
+    groups = [resolution_cmds, color_cmds, font_cmds, screen_cmds]
+    codes = run_batched([cmd for group in groups for cmd in group])
+    group_ok = []
+    for group in groups:
+        group_ok.append(not any(codes[:len(group)]))
+        codes = codes[len(group):]
+    resolution_ok, color_ok, font_ok, screen_ok = group_ok
+
     # Resolution optimization
     current_step += 1
     track_progress_no_dialog(current_step, total_steps, "Optimizing resolution settings")
     if is_retina:
-        if subprocess.run(["sudo", "defaults", "write", "NSGlobalDomain", "AppleFontSmoothing", "-int", "0"], stderr=subprocess.DEVNULL).returncode == 0 and \
-           subprocess.run(["sudo", "defaults", "write", "NSGlobalDomain", "CGFontRenderingFontSmoothingDisabled", "-bool", "true"], stderr=subprocess.DEVNULL).returncode == 0:
+        if resolution_ok:
             changes_made.append("Optimized Retina display settings")
             print(f"\r  {GREEN}✓{NC} Optimized Retina settings for performance")
     else:
-        if subprocess.run(["sudo", "defaults", "write", "NSGlobalDomain", "AppleFontSmoothing", "-int", "1"], stderr=subprocess.DEVNULL).returncode == 0:
+        if resolution_ok:
             changes_made.append("Optimized standard display settings")
             print(f"\r  {GREEN}✓{NC} Optimized standard display settings")
 
     # Color profile optimization
     current_step += 1
     track_progress_no_dialog(current_step, total_steps, "Optimizing color settings")
-    if subprocess.run(["sudo", "defaults", "write", "NSGlobalDomain", "AppleICUForce24HourTime", "-bool", "true"], stderr=subprocess.DEVNULL).returncode == 0 and \
-       subprocess.run(["sudo", "defaults", "write", "NSGlobalDomain", "AppleDisplayScaleFactor", "-int", "1"], stderr=subprocess.DEVNULL).returncode == 0:
+    if color_ok:
         changes_made.append("Optimized color settings")
         print(f"\r  {GREEN}✓{NC} Display color optimized")
 
     # Font rendering
     current_step += 1
     track_progress_no_dialog(current_step, total_steps, "Optimizing font rendering")
-    if subprocess.run(["sudo", "defaults", "write", "NSGlobalDomain", "AppleFontSmoothing", "-int", "1"], stderr=subprocess.DEVNULL).returncode == 0 and \
-       subprocess.run(["sudo", "defaults", "write", "-g", "CGFontRenderingFontSmoothingDisabled", "-bool", "NO"], stderr=subprocess.DEVNULL).returncode == 0:
+    if font_ok:
         changes_made.append("Optimized font rendering")
         print(f"\r  {GREEN}✓{NC} Font rendering optimized")
 
     # Screen update optimization
     current_step += 1
     track_progress_no_dialog(current_step, total_steps, "Optimizing screen updates")
-    if subprocess.run(["sudo", "defaults", "write", "com.apple.CrashReporter", "DialogType", "none"], stderr=subprocess.DEVNULL).returncode == 0 and \
-       subprocess.run(["sudo", "defaults", "write", "com.apple.screencapture", "disable-shadow", "-bool", "true"], stderr=subprocess.DEVNULL).returncode == 0:
+    if screen_ok:
         changes_made.append("Optimized screen updates")
         print(f"\r  {GREEN}✓{NC} Screen updates optimized")
 
@@ -540,8 +873,11 @@ def optimize_display():
     subprocess.run(["killall", "SystemUIServer"], stderr=subprocess.DEVNULL)
     print(f"\r  {GREEN}✓{NC} Display changes applied")
 
-    # Store final measurements
-    subprocess.run(["system_profiler", "SPDisplaysDataType"], stdout=open(f"{MEASUREMENTS_FILE}.after", "w"), check=False)
+    # Store final measurements; the cached snapshot predates the changes, so re-probe
+    _sp_displays.cache_clear()
+    after_info = _sp_displays()
+    with open(f"{MEASUREMENTS_FILE}.after", "w") as f:
+        f.write(after_info)
 
     # Show optimization summary
     print(f"\n{CYAN}Optimization Summary:{NC}")
@@ -551,12 +887,9 @@ def optimize_display():
 
     # Compare before/after display settings
     print(f"\n{CYAN}Display Settings Changes:{NC}")
-    before_res = next((line.split(": ")[1] for line in open(f"{MEASUREMENTS_FILE}.before").readlines() if "Resolution:" in line), "N/A")
-    after_res = next((line.split(": ")[1] for line in open(f"{MEASUREMENTS_FILE}.after").readlines() if "Resolution:" in line), "N/A")
+    before_res, before_depth = _display_fields(display_info)
+    after_res, after_depth = _display_fields(after_info)
     print(f"Resolution: {before_res} -> {after_res}")
-
-    before_depth = next((line.split(": ")[1] for line in open(f"{MEASUREMENTS_FILE}.before").readlines() if "Depth:" in line), "N/A")
-    after_depth = next((line.split(": ")[1] for line in open(f"{MEASUREMENTS_FILE}.after").readlines() if "Depth:" in line), "N/A")
     print(f"Color Depth: {before_depth} -> {after_depth}")
 
     print(f"\n{GREEN}Display optimization completed successfully{NC}")
@@ -564,78 +897,122 @@ def optimize_display():
     time.sleep(1)
     return 0
 
+# Delete everything inside root (but not root itself) with os.scandir, recursing into
+# subdirectories; entries that cannot be removed are skipped. Returns the bytes freed.
+def purge_dir(root: str) -> int:
+    freed = 0
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        freed += purge_dir(entry.path)
+                        os.rmdir(entry.path)
+                    else:
+                        size = entry.stat(follow_symlinks=False).st_size
+                        os.unlink(entry.path)
+                        freed += size
+                except OSError:
+                    pass
+    except OSError:
+        pass
+    return freed
+
 # Storage optimization
 def optimize_storage():
     log("Starting storage optimization")
     print(f"\n{CYAN}Storage Optimization Progress:{NC}")
     initial_space = subprocess.getoutput("df -h / | awk 'NR==2 {printf \"%s of %s\", $4, $2}'")
     print(f"{STATS} Initial Storage Available: {initial_space}")
-    tmp_dir = subprocess.run(["mktemp", "-d"], capture_output=True, text=True, check=False).stdout.strip()
     total_steps = 5
     current_step = 0
+    freed = 0
+
+    # The root-owned caches and logs are cleared by one sudo find that runs in the
+    # background while the user-owned directories are purged below
+    system_purge = None
+    if ensure_sudo():
+        system_purge = subprocess.Popen(["sudo", "-n", "find", "/Library/Caches", "/System/Library/Caches", "/private/var/log",
+                                         "-mindepth", "1", "-delete"],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _running_procs.add(system_purge)
 
     # 1. Clean User Cache
     current_step += 1
     print(f"\n{HOURGLASS} Cleaning user cache...", end="")
-    with open(os.path.join(tmp_dir, "user_cache.log"), "w") as f:
-        subprocess.run(["sudo", "rm", "-rf", os.path.expanduser("~/Library/Caches/*"), 
-                       os.path.expanduser("~/Library/Application Support/*/Cache/*")], 
-                       stdout=f, stderr=f, check=False)
+    freed += purge_dir(os.path.expanduser("~/Library/Caches"))
+    for cache_dir in glob.glob(os.path.expanduser("~/Library/Application Support/*/Cache")):
+        freed += purge_dir(cache_dir)
     show_progress((current_step * 100) // total_steps, "User cache cleaned")
 
     # 2. Clean System Cache
     current_step += 1
     print(f"\n{HOURGLASS} Cleaning system cache...", end="")
-    with open(os.path.join(tmp_dir, "system_cache.log"), "w") as f:
-        subprocess.run(["sudo", "rm", "-rf", "/Library/Caches/*", "/System/Library/Caches/*"],
-                      stdout=f, stderr=f, check=False)
+    if system_purge is not None:
+        system_purge.wait()
+        _running_procs.discard(system_purge)
     show_progress((current_step * 100) // total_steps, "System cache cleaned")
 
     # 3. Clean Docker files
     current_step += 1
     print(f"\n{HOURGLASS} Cleaning Docker files...", end="")
-    with open(os.path.join(tmp_dir, "docker.log"), "w") as f:
-        docker_paths = [
-            "~/Library/Containers/com.docker.docker/Data/vms/*",
-            "~/Library/Containers/com.docker.docker/Data/log/*", 
-            "~/Library/Containers/com.docker.docker/Data/cache/*",
-            "~/Library/Group Containers/group.com.docker/Data/cache/*",
-            "~/Library/Containers/com.docker.docker/Data/tmp/*"
-        ]
-        for path in docker_paths:
-            subprocess.run(["sudo", "rm", "-rf", os.path.expanduser(path)], 
-                         stdout=f, stderr=f, check=False)
+    docker_paths = [
+        "~/Library/Containers/com.docker.docker/Data/vms",
+        "~/Library/Containers/com.docker.docker/Data/log",
+        "~/Library/Containers/com.docker.docker/Data/cache",
+        "~/Library/Group Containers/group.com.docker/Data/cache",
+        "~/Library/Containers/com.docker.docker/Data/tmp"
+    ]
+    for path in docker_paths:
+        freed += purge_dir(os.path.expanduser(path))
     show_progress((current_step * 100) // total_steps, "Docker files cleaned")
 
     # 4. Clean Development Cache
     current_step += 1
     print(f"\n{HOURGLASS} Cleaning development cache...", end="")
-    with open(os.path.join(tmp_dir, "dev_cache.log"), "w") as f:
-        subprocess.run(["sudo", "rm", "-rf", 
-                       os.path.expanduser("~/Library/Developer/Xcode/DerivedData/*"),
-                       os.path.expanduser("~/Library/Developer/Xcode/Archives/*")],
-                       stdout=f, stderr=f, check=False)
+    freed += purge_dir(os.path.expanduser("~/Library/Developer/Xcode/DerivedData"))
+    freed += purge_dir(os.path.expanduser("~/Library/Developer/Xcode/Archives"))
     show_progress((current_step * 100) // total_steps, "Development cache cleaned")
 
     # 5. Clean System Logs
     current_step += 1
     print(f"\n{HOURGLASS} Cleaning system logs...", end="")
-    with open(os.path.join(tmp_dir, "logs.log"), "w") as f:
-        subprocess.run(["sudo", "rm", "-rf", "/private/var/log/*", 
-                       os.path.expanduser("~/Library/Logs/*")],
-                       stdout=f, stderr=f, check=False)
+    freed += purge_dir(os.path.expanduser("~/Library/Logs"))
     show_progress((current_step * 100) // total_steps, "System logs cleaned")
 
     # Show final storage status
     final_space = subprocess.getoutput("df -h / | awk 'NR==2 {printf \"%s of %s\", $4, $2}'")
     print(f"\n\n{STATS} Final Storage Available: {final_space}")
-
-    # Cleanup
-    shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"{STATS} Freed from user caches and logs: {freed / 1048576:.1f} MB")
 
     success("Storage optimization completed")
     return 0
 
+# Run a command without a shell and without blocking the event loop; returns its stdout
+async def command_output(*argv: str) -> str:
+    proc = await asyncio.create_subprocess_exec(*argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+    out, _ = await proc.communicate()
+    return out.decode()
+
+# System tuning and storage cleanup touch independent state and spend nearly all their
+# time waiting on subprocesses, so they run side by side on worker threads. Graphics and
+# display both write the NSGlobalDomain/WindowServer defaults, so they run one after the
+# other, after a single backup taken before anything changes. submit schedules one
+# blocking function and returns an awaitable; the UI passes its bounded, cancel-aware pool
+async def optimize_all(submit=asyncio.to_thread):
+    log("Starting all optimizations")
+    await submit(backup_graphics_settings)
+
+    def graphics_then_display():
+        return max(optimize_graphics(backup=False), optimize_display())
+
+    results = await asyncio.gather(
+        submit(optimize_system_performance),
+        submit(graphics_then_display),
+        submit(optimize_storage),
+    )
+    return max(results)
+
 # Add missing constants
 HOURGLASS = '⌛'
 STATS = '📊'
@@ -685,7 +1062,7 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
             if asyncio.iscoroutinefunction(func):
                 result = await func()
             else:
-                result = await asyncio.to_thread(func)
+                result = await self._submit(func)
             self.progress_bar.value = 1
             self.progress_percentage.text = '100%'
             return result
@@ -728,7 +1105,7 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         """Initialize all required attributes"""
         self.current_task = None
         self.progress = 0
-        self.notifications = []
+        self.notifications = deque(maxlen=MAX_NOTIFICATIONS)
         self.dark = True
         self.status = 'Ready'
         self.cpu_progress = None
@@ -744,6 +1121,19 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         self.notification_center = None
         self.log_level = None
         self.log_area = None
+        self.log_offset = 0
+        # Held by every reader of LOG_FILE so two refreshes never append the same chunk
+        self._log_lock = asyncio.Lock()
+        self._filter_cache = {}
+        self._active_toasts = OrderedDict()
+        self._last_activity_render = ()
+        self._stat_cache = {}
+        # Optimizations run on a small dedicated pool so repeated clicks cannot pile up threads
+        self._opt_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="opt")
+        # Worker futures still running, including ones abandoned by a timed-out run
+        self._workers = set()
+        self._run_token = None
+        app.on_shutdown(self._stop_workers)
 
     def setup_theme(self):
         """Setup UI theme"""
@@ -790,19 +1180,13 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         with ui.column():
             with ui.card():
                 with ui.row():
-                        ui.icon('computer')
-                        with ui.column():
+                    ui.icon('computer')
+                    with ui.column():
                         ui.label('Mac System')
                         ui.label(f'{MACOS_VERSION}')
 
             with ui.list():
-                    menu_items = [
-                        ('dashboard', 'Dashboard', 'dashboard'),
-                        ('optimizations', 'Optimizations', 'tune'),
-                        ('logs', 'System Logs', 'article'),
-                        ('settings', 'Settings', 'settings'),
-                    ]
-                    for page, label, icon in menu_items:
+                for page, label, icon in MENU_ITEMS:
                     with ui.item(on_click=lambda p=page: self.show_page(p)):
                         with ui.row():
                             ui.icon(icon)
@@ -829,7 +1213,7 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         
         # Hide all pages initially
         for page in self.pages.values():
-            page.style('display: none')
+            page.set_visibility(False)
         
         # Show dashboard by default
         self.show_page('dashboard')
@@ -839,10 +1223,99 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         self.setup_notifications()
         self.setup_system_monitor()
         self.error_container = ui.element('div')
+        self.start_background_tasks()
 
     def start_background_tasks(self):
         """Start background tasks"""
-        self.log_monitor = ui.timer(1.0, self.update_logs)
+        # Refresh the log view when LOG_FILE changes (FSEvents via watchdog); poll only
+        # when watchdog is unavailable
+        if Observer is not None:
+            app.on_startup(self._start_log_watcher)
+        else:
+            self.log_monitor = ui.timer(1.0, self.update_logs)
+        self.status_monitor = ui.timer(STATUS_INTERVAL, self.update_system_status)
+        app.on_startup(self._attach_progress_sink)
+
+    async def _attach_progress_sink(self):
+        """Route optimizer progress from worker threads to the progress bar"""
+        loop = asyncio.get_running_loop()
+        set_progress_sink(lambda value, message: loop.call_soon_threadsafe(self._update_progress, value, message))
+
+    async def _cached(self, key: str, ttl: float, factory):
+        """Return the last sample for key if it is younger than ttl, else take a new one"""
+        now = time.monotonic()
+        cached = self._stat_cache.get(key)
+        if cached is not None and now - cached[0] < ttl:
+            return cached[1]
+        value = await factory()
+        self._stat_cache[key] = (now, value)
+        return value
+
+    # With psutil the CPU and memory samples are in-process host_processor_info /
+    # host_statistics64 reads; ps and vm_stat are only spawned without it
+    async def _sample_cpu(self) -> float:
+        if psutil is not None:
+            # Utilisation since the previous call, so no blocking sample interval is needed
+            return psutil.cpu_percent(interval=None) / 100
+        cpu_out = await command_output("ps", "-A", "-o", "%cpu")
+        return min(sum(float(value) for value in cpu_out.split()[1:]) / (100 * (os.cpu_count() or 1)), 1.0)
+
+    async def _sample_memory(self) -> float:
+        if psutil is not None:
+            return psutil.virtual_memory().percent / 100
+        pages = cached_vm_sample()
+        if pages is None:
+            pages = store_vm_sample(await command_output("vm_stat"))
+        pages_free = pages.get("Pages free", 0)
+        pages_active = pages.get("Pages active", 0)
+        return pages_active / (pages_active + pages_free)
+
+    async def _sample_disk(self) -> float:
+        stats = os.statvfs("/")
+        return 1 - stats.f_bfree / stats.f_blocks
+
+    async def _start_log_watcher(self):
+        """Watch LOG_FILE and schedule update_logs on the event loop when it changes"""
+        loop = asyncio.get_running_loop()
+        pending = False
+
+        async def refresh():
+            nonlocal pending
+            pending = False
+            await self.update_logs()
+
+        def schedule():
+            # Coalesce bursts of events into one update
+            nonlocal pending
+            if not pending:
+                pending = True
+                loop.create_task(refresh())
+
+        # Only writes, creation and rotation (moves) of LOG_FILE itself; opened/closed events
+        # would fire on our own reads and make every tail schedule another one
+        handler = PatternMatchingEventHandler(patterns=[LOG_FILE], ignore_directories=True)
+        notify = lambda event: loop.call_soon_threadsafe(schedule)
+        handler.on_modified = handler.on_created = handler.on_moved = notify
+        self.log_observer = Observer()
+        self.log_observer.schedule(handler, os.path.dirname(LOG_FILE), recursive=False)
+        self.log_observer.start()
+        app.on_shutdown(self.log_observer.stop)
+        await self.update_logs()
+
+    async def update_system_status(self):
+        """Refresh the CPU, memory and disk monitors"""
+        try:
+            # Samples younger than their STATUS_TTL are reused; stale ones are re-taken side by side
+            cpu, memory, disk = await asyncio.gather(
+                self._cached('cpu', STATUS_TTL['cpu'], self._sample_cpu),
+                self._cached('memory', STATUS_TTL['memory'], self._sample_memory),
+                self._cached('disk', STATUS_TTL['disk'], self._sample_disk),
+            )
+            self.cpu_progress.value = round(cpu, 2)
+            self.memory_progress.value = round(memory, 2)
+            self.disk_progress.value = round(disk, 2)
+        except Exception as e:
+            self.show_notification(f'Error updating system status: {str(e)}', type='error')
 
     def setup_system_monitor(self):
         with ui.card():
@@ -850,29 +1323,17 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
                 ui.label('System Monitor')
                 
                 with ui.grid(columns=3):
-                    # CPU Monitor
-                    with ui.card():
-                        with ui.row():
-                            ui.icon('speed')
-                            with ui.column():
-                                ui.label('CPU Usage')
-                                self.cpu_progress = ui.linear_progress(value=0, show_value=True)
-                    
-                    # Memory Monitor
-                    with ui.card():
-                        with ui.row():
-                            ui.icon('memory')
-                            with ui.column():
-                                ui.label('Memory Usage')
-                                self.memory_progress = ui.linear_progress(value=0, show_value=True)
-                    
-                    # Disk Monitor
-                    with ui.card():
-                        with ui.row():
-                            ui.icon('storage')
-                            with ui.column():
-                                ui.label('Disk Usage')
-                                self.disk_progress = ui.linear_progress(value=0, show_value=True)
+                    for attr, label, icon in SYSTEM_MONITORS:
+                        setattr(self, attr, self._monitor_card(label, icon))
+
+    def _monitor_card(self, label: str, icon: str):
+        """Build one monitor card and return its progress bar"""
+        with ui.card():
+            with ui.row():
+                ui.icon(icon)
+                with ui.column():
+                    ui.label(label)
+                    return ui.linear_progress(value=0, show_value=True)
 
     def setup_dashboard(self):
         with ui.column():
@@ -900,6 +1361,7 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
                 self.progress_label = ui.label('Ready')
                 self.progress_bar = ui.linear_progress(value=0)
                 self.progress_percentage = ui.label('0%')
+                ui.button('Cancel', on_click=self.cancel_optimization, icon='cancel')
             
             with ui.card():
                 ui.label('Recent Activity')
@@ -956,6 +1418,17 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
                             on_click=lambda: self.run_optimization(self.optimize_storage)
                         )
 
+                # Everything
+                with ui.card():
+                    with ui.column():
+                        ui.icon('bolt')
+                        ui.label('All Optimizations')
+                        ui.label('Run every optimization above at the same time')
+                        ui.button(
+                            'Optimize All',
+                            on_click=lambda: self.run_optimization(self.optimize_all)
+                        )
+
     def setup_logs(self):
         with ui.column():
             with ui.card():
@@ -1016,10 +1489,7 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
     def show_page(self, page_name: str):
         """Show the selected page and hide others"""
         for name, page in self.pages.items():
-            if name == page_name:
-                page.style('display: block')
-            else:
-                page.style('display: none')
+            page.set_visibility(name == page_name)
 
     def show_notifications(self):
         """Show notifications dialog"""
@@ -1029,30 +1499,53 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
                 with ui.scroll_area():
                     for notification in reversed(self.notifications):
                         with ui.row():
-                            ui.icon(notification.get('icon', 'info'))
+                            ui.icon(notification.get('icon', 'info'), color=notification.get('color'))
                             ui.label(notification.get('text', ''))
                 ui.button('Close', on_click=dialog.close)
 
     def setup_notifications(self):
         """Initialize notification center"""
         self.notification_center = ui.element('div')
-        self.notifications = []
+        self.notifications = deque(maxlen=MAX_NOTIFICATIONS)
 
     def show_notification(self, message: str, type: str = 'info'):
         """Show a notification"""
+        # Repeats of a message within NOTIFICATION_WINDOW of its first showing update
+        # that entry's "(×N)" count instead of adding new ones, so a failing timer cannot
+        # flood the notification list and activity feed; the window is not extended by
+        # repeats, so a message that keeps recurring still gets a fresh entry each window
+        now = time.monotonic()
+        while self._active_toasts and next(iter(self._active_toasts.values()))[0] <= now:
+            self._active_toasts.popitem(last=False)
+        key = (message, type)
+        active = self._active_toasts.get(key)
+        if active is not None:
+            active[2] += 1
+            active[1]['text'] = f'{message} (×{active[2]})'
+            active[1]['time'] = datetime.datetime.now()
+            self.update_activity()
+            return
+        if type == 'error':
+            self.log_error(message)
+
+        icon, color = NOTIFICATION_STYLES.get(type, NOTIFICATION_STYLES['info'])
         notification = {
             'text': message,
-            'icon': {
-                'info': 'info',
-                'success': 'check_circle',
-                'warning': 'warning',
-                'error': 'error'
-            }.get(type, 'info'),
+            'icon': icon,
+            'color': color,
             'time': datetime.datetime.now()
         }
+        self._active_toasts[key] = [now + NOTIFICATION_WINDOW, notification, 1]
+        while len(self._active_toasts) > MAX_ACTIVE_NOTIFICATIONS:
+            self._active_toasts.popitem(last=False)
         self.notifications.append(notification)
         self.update_activity()
 
+    def log_error(self, message: str):
+        """Record a UI error in the optimizer log"""
+        # Goes through the queued logger: one open file handle, timestamp formatted at most once a second
+        logger.error("[ERROR] %s", message)
+
     def show_help(self):
         """Show help dialog"""
         with ui.dialog() as dialog:
@@ -1087,15 +1580,20 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
 
     def update_activity(self):
         """Update activity list"""
-        if not hasattr(self, 'activity_list'):
+        if self.activity_list is None:
             return
-        
+
+        # Newest five, rebuilt in one pass and only when they differ from what is shown
+        recent = tuple((n.get('icon', 'info'), n.get('color'), n.get('text', '')) for n in itertools.islice(reversed(self.notifications), 5))
+        if recent == self._last_activity_render:
+            return
+        self._last_activity_render = recent
         self.activity_list.clear()
         with self.activity_list:
-            for notification in list(reversed(self.notifications))[:5]:
+            for icon, color, text in recent:
                 with ui.row():
-                    ui.icon(notification.get('icon', 'info'))
-                    ui.label(notification.get('text', ''))
+                    ui.icon(icon, color=color)
+                    ui.label(text)
 
     async def run_verification(self):
         """Run system verification"""
@@ -1121,55 +1619,88 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
 
     async def update_logs(self):
         """Update logs in real-time"""
-        if os.path.exists(LOG_FILE):
-            try:
-                with open(LOG_FILE, 'r') as f:
-                    new_logs = f.read()
-                if hasattr(self, 'log_area') and new_logs != self.log_area.value:
-                    self.log_area.value = new_logs
-            except Exception as e:
-                self.show_notification(f'Error updating logs: {str(e)}', type='error')
+        async with self._log_lock:
+            await self._append_new_logs()
 
-    def filter_logs(self):
-        """Filter logs based on selected level"""
-        if not os.path.exists(LOG_FILE):
+    async def _append_new_logs(self):
+        # Only the bytes appended since the last tick are read and sent to the client
+        try:
+            size = (await aiofiles.os.stat(LOG_FILE)).st_size
+        except OSError:
+            return
+        if size < self.log_offset:
+            # The log was rotated or truncated; start over from the beginning
+            self.log_offset = 0
+            if self.log_area is not None:
+                self.log_area.value = ''
+        if size == self.log_offset:
             return
-        
         try:
-            with open(LOG_FILE, 'r') as f:
-                logs = f.readlines()
-            
-            filtered_logs = []
-            level = self.log_level.value
-            
-            for log in logs:
-                if level == 'All' or f'[{level}]' in log:
-                    filtered_logs.append(log)
-            self.show_notification(f'Error refreshing logs: {str(e)}', type='error')
-
-            self.log_area.value = ''.join(filtered_logs)
+            async with aiofiles.open(LOG_FILE, 'rb') as f:
+                await f.seek(self.log_offset)
+                chunk = await f.read()
+            # Stop at the last complete line; a half-written line (or a UTF-8 sequence cut
+            # at the chunk boundary) stays in the file for the next read
+            end = chunk.rfind(b'\n') + 1
+            if not end:
+                return
+            self.log_offset += end
+            if self.log_area is not None:
+                self.log_area.value += self._filter_level(chunk[:end].decode(errors='replace'))
         except Exception as e:
-            self.show_notification(f'Error filtering logs: {str(e)}', type='error')
+            self.show_notification(f'Error updating logs: {str(e)}', type='error')
+
+    def _filter_level(self, text: str) -> str:
+        """Keep only the lines of text at the selected log level"""
+        level = self.log_level.value if self.log_level is not None else 'All'
+        if level == 'All':
+            return text
+        pattern = self._filter_cache.get(level)
+        if pattern is None:
+            pattern = self._filter_cache[level] = re.compile(rf'^.*\[{re.escape(level)}\].*\n?', re.MULTILINE)
+        return ''.join(pattern.findall(text))
+
+    async def filter_logs(self):
+        """Filter logs based on selected level"""
+        async with self._log_lock:
+            try:
+                async with aiofiles.open(LOG_FILE, 'rb') as f:
+                    data = await f.read()
+                # Complete lines only, as in update_logs
+                self.log_offset = data.rfind(b'\n') + 1
+                logs = data[:self.log_offset].decode(errors='replace')
+            except FileNotFoundError:
+                return
 
-    def refresh_logs(self):
+            try:
+                self.log_area.value = self._filter_level(logs)
+            except Exception as e:
+                self.show_notification(f'Error filtering logs: {str(e)}', type='error')
+
+    async def refresh_logs(self):
         """Refresh log display"""
         try:
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'r') as f:
-                    self.log_area.value = f.read()
-                self.show_notification('Logs refreshed', type='success')
-            else:
-                self.log_area.value = 'No logs available'
-            except Exception as e:
+            async with self._log_lock:
+                try:
+                    async with aiofiles.open(LOG_FILE, 'rb') as f:
+                        data = await f.read()
+                    self.log_offset = data.rfind(b'\n') + 1
+                    self.log_area.value = self._filter_level(data[:self.log_offset].decode(errors='replace'))
+                    self.show_notification('Logs refreshed', type='success')
+                except FileNotFoundError:
+                    self.log_area.value = 'No logs available'
+        except Exception as e:
             self.show_notification(f'Error refreshing logs: {str(e)}', type='error')
 
-    def clear_logs(self):
+    async def clear_logs(self):
         """Clear logs"""
         try:
-            self.log_area.value = ''
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'w') as f:
-                    f.write('')
+            async with self._log_lock:
+                self.log_area.value = ''
+                if await aiofiles.os.path.exists(LOG_FILE):
+                    async with aiofiles.open(LOG_FILE, 'w') as f:
+                        await f.write('')
+                self.log_offset = 0
             self.show_notification('Logs cleared', type='success')
         except Exception as e:
             self.show_notification(f'Error clearing logs: {str(e)}', type='error')
@@ -1179,6 +1710,10 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         if self.current_task:
             self.show_notification('An optimization is already running', type='warning')
             return
+        if self._workers:
+            # A cancelled or timed-out run's thread has not returned yet
+            self.show_notification('The previous optimization is still stopping', type='warning')
+            return
 
         try:
             self.show_loading('Running optimization...')
@@ -1186,9 +1721,11 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
             self.progress_bar.value = 0
             self.progress_percentage.text = '0%'
             
-            # Create and run the task
+            # Create and run the task; a stuck run (e.g. waiting on sudo) is abandoned after
+            # OPTIMIZATION_TIMEOUT so the UI can start another one
+            self._run_token = start_run()
             self.current_task = asyncio.create_task(self._run_optimization_task(optimization_func))
-            result = await self.current_task
+            result = await asyncio.wait_for(self.current_task, timeout=OPTIMIZATION_TIMEOUT)
             
             if result == 0:
                 self.show_notification('Optimization completed successfully', type='success')
@@ -1197,6 +1734,14 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
                 self.show_notification('Optimization completed with warnings', type='warning')
                 self.add_activity('Optimization completed with warnings', icon='warning')
             
+        except asyncio.TimeoutError:
+            cancel_running(self._run_token)
+            self.show_notification('Optimization timed out and was stopped', type='error')
+            self.add_activity('Optimization timed out', icon='error')
+        except asyncio.CancelledError:
+            cancel_running(self._run_token)
+            self.show_notification('Optimization cancelled', type='warning')
+            self.add_activity('Optimization cancelled', icon='warning')
         except Exception as e:
             error_msg = str(e)
             self.show_notification(f'Error: {error_msg}', type='error')
@@ -1206,6 +1751,24 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
             self.hide_loading()
             self.progress_label.text = 'Ready'
 
+    def cancel_optimization(self):
+        """Cancel the running optimization and stop its child processes"""
+        if self.current_task:
+            self.current_task.cancel()
+            cancel_running(self._run_token)
+
+    def _stop_workers(self):
+        """Stop the running optimization's processes and let shutdown go on without its threads"""
+        cancel_running(self._run_token)
+        self._opt_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, func):
+        """Run a blocking optimizer on the optimization pool in the current run's context"""
+        future = self._opt_executor.submit(contextvars.copy_context().run, func)
+        self._workers.add(future)
+        future.add_done_callback(self._workers.discard)
+        return asyncio.wrap_future(future)
+
     async def _run_optimization_task(self, func):
         """Run the optimization function in a task"""
         try:
@@ -1213,7 +1776,7 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
             if asyncio.iscoroutinefunction(func):
                 result = await func()
             else:
-                result = await asyncio.to_thread(func)
+                result = await self._submit(func)
             return result
         except Exception as e:
             raise e
@@ -1246,16 +1809,21 @@ PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
         except Exception as e:
             raise e
 
+    async def optimize_all(self):
+        """Run all optimizations concurrently"""
+        try:
+            return await optimize_all(self._submit)
+        except Exception as e:
+            raise e
+
 # Modified progress tracking functions
 def show_progress(percent: int, message: str = ''):
     """Update progress in UI"""
-    if hasattr(ui, 'current') and hasattr(ui.current, 'optimizer'):
-        ui.current.optimizer.update_progress(percent / 100, message)
+    report_progress(percent, 100, message)
 
 def track_progress_no_dialog(step: int, total: int, message: str):
     """Update progress without dialog"""
-    if hasattr(ui, 'current') and hasattr(ui.current, 'optimizer'):
-        ui.current.optimizer.update_progress(step / total, message)
+    report_progress(step, total, message)
 
 # Main entry point
 def main():
@@ -1267,7 +1835,6 @@ def main():
         
         # Create and store the app instance
         app = MacOptimizerUI()
-        ui.current.optimizer = app
         
         ui.run(
             title='Mac Optimizer',
@@ -1,20 +1,38 @@
 import asyncio
-from playwright.async_api import async_playwright
+import base64
+import html
+import logging
 import os
+import sys
+import time
 from pathlib import Path
 
-async def take_cli_screenshot():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        context = await browser.new_context()
-        page = await context.new_page()
-        
-        # Launch terminal with custom size for better menu visibility
-        await page.evaluate('''() => {
-            const terminal = window.open('', '', 'width=800,height=600');
-            terminal.document.write(`
-                <div style="background: black; color: white; font-family: monospace; padding: 20px; height: 100%;">
-                    <pre>
+# The browser pool (launch options, CDP endpoint reuse) lives in take_screenshot.py
+# at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from take_screenshot import close_browser, get_browser
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+log = logging.getLogger(__name__)
+
+# Set SCREENSHOT_BLOCK_RESOURCES=1 to skip images, fonts and media on the GUI
+# shot when only the layout matters; icon fonts will render as text then
+BLOCK_RESOURCES = os.environ.get('SCREENSHOT_BLOCK_RESOURCES') == '1'
+BLOCKED_RESOURCES = frozenset({'image', 'font', 'media'})
+
+GUI_URL = 'http://localhost:8080'
+GUI_SIZE = (1200, 800)
+
+PAINT_SETTLED_JS = """() => Promise.all([
+    document.fonts.ready,
+    new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r))),
+])"""
+
+MENU_TEXT = """\
 macOS Optimizer CLI v1.0
 ------------------------
 Please select an option:
@@ -44,46 +62,115 @@ Please select an option:
 7. Exit
 
 Enter your choice (1-7): _
-                    </pre>
-                </div>
-            `);
-        }''')
-        
-        # Create images directory if it doesn't exist
-        Path('docs/images').mkdir(parents=True, exist_ok=True)
-        
-        # Take screenshot with padding and proper sizing
-        await page.screenshot(path='docs/images/cli-screenshot.png', full_page=True)
-        await browser.close()
-
-async def take_gui_screenshot():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        context = await browser.new_context(viewport={'width': 1200, 'height': 800})
+"""
+
+CLI_MENU_HTML = (
+    '<body style="margin: 0; background: black;">'
+    '<div style="color: white; font-family: monospace; padding: 20px;">'
+    f'<pre>{html.escape(MENU_TEXT)}</pre></div></body>'
+)
+CLI_MENU_URL = 'data:text/html;base64,' + base64.b64encode(CLI_MENU_HTML.encode()).decode()
+
+CLI_SIZE = (800, 600)
+MONO_FONTS = ('Menlo.ttc', 'DejaVuSansMono.ttf')
+
+def render_cli_screenshot(path):
+    # Rasterize the menu straight to PNG; no browser needed for plain text
+    image = Image.new('RGB', CLI_SIZE, 'black')
+    for name in MONO_FONTS:
+        try:
+            font = ImageFont.truetype(name, 14)
+            break
+        except OSError:
+            continue
+    else:
+        font = ImageFont.load_default()
+    ImageDraw.Draw(image).multiline_text((20, 20), MENU_TEXT, fill='white', font=font)
+    image.save(path, optimize=True)
+
+async def take_cli_screenshot(browser):
+    if Image is not None:
+        await asyncio.to_thread(render_cli_screenshot, 'docs/images/cli-screenshot.png')
+        return
+
+    width, height = CLI_SIZE
+    context = await browser.new_context(viewport={'width': width, 'height': height})
+    try:
+        page = await context.new_page()
+
+        # Load the menu from a data: URL, sized by the viewport; nothing hits
+        # the network, so plain "load" is enough
+        await page.goto(CLI_MENU_URL, wait_until='load')
+
+        # Capture exactly the terminal box; the README embeds it as PNG
+        await page.screenshot(
+            path='docs/images/cli-screenshot.png', type='png',
+            clip={'x': 0, 'y': 0, 'width': width, 'height': height},
+        )
+    finally:
+        await context.close()
+
+async def _abort_heavy(route):
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def take_gui_screenshot(browser, block_resources=BLOCK_RESOURCES):
+    # The README shot is always the fixed GUI_SIZE window, so the viewport and clip are
+    # known up front and nothing needs measuring
+    width, height = GUI_SIZE
+    context = await browser.new_context(viewport={'width': width, 'height': height})
+    if block_resources:
+        # Fewer in-flight requests lets networkidle settle sooner
+        await context.route('**/*', _abort_heavy)
+    try:
         page = await context.new_page()
         
         # Wait for the GUI to load and be fully rendered
-        await page.goto('http://localhost:8080')
+        await page.goto(GUI_URL)
         await page.wait_for_load_state('networkidle')
-        await page.wait_for_timeout(2000)  # Wait for animations
-        
-        # Create images directory if it doesn't exist
-        Path('docs/images').mkdir(parents=True, exist_ok=True)
+        # Wait for web fonts and two animation frames so layout and paint have
+        # settled, instead of sleeping a fixed 2s
+        await page.evaluate(PAINT_SETTLED_JS)
         
         # Take screenshot
-        await page.screenshot(path='docs/images/gui-screenshot.png')
-        await browser.close()
+        await page.screenshot(
+            path='docs/images/gui-screenshot.png',
+            clip={'x': 0, 'y': 0, 'width': width, 'height': height},
+        )
+    finally:
+        await context.close()
+
+async def _timed(name, coro):
+    start = time.perf_counter()
+    await coro
+    return name, time.perf_counter() - start
 
 async def main():
-    # Take CLI screenshot first
-    print("Taking CLI screenshot...")
-    await take_cli_screenshot()
-    print("CLI screenshot saved to docs/images/cli-screenshot.png")
-    
-    # Then take GUI screenshot
-    print("Taking GUI screenshot...")
-    await take_gui_screenshot()
-    print("GUI screenshot saved to docs/images/gui-screenshot.png")
+    # Create images directory once, before the shots race to write into it
+    Path('docs/images').mkdir(parents=True, exist_ok=True)
+
+    # Both shots share one Chromium with a fresh context each, and their page
+    # loads overlap; one failing must not cancel the other.
+    browser = await get_browser()
+    try:
+        results = await asyncio.gather(
+            _timed('cli', take_cli_screenshot(browser)),
+            _timed('gui', take_gui_screenshot(browser)),
+            return_exceptions=True
+        )
+    finally:
+        await close_browser()
+
+    done = []
+    for name, result in zip(('cli', 'gui'), results):
+        if isinstance(result, Exception):
+            log.error("%s screenshot failed: %s", name, result)
+        else:
+            done.append("%s %.2fs" % (name, result[1]))
+    log.info("screenshots saved to docs/images: %s", ", ".join(done) or "none")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main())
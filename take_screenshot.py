@@ -1,12 +1,148 @@
 
-from playwright.sync_api import sync_playwright
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from playwright.async_api import async_playwright
 
-def take_screenshot(url, output_path):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url)
-        page.screenshot(path=output_path)
-        browser.close()
+# Screenshot-only work needs no extensions or GPU, so use the lighter
+# headless shell build: `playwright install chromium-headless-shell`
+LAUNCH_OPTIONS = {
+    'channel': 'chromium-headless-shell',
+    'args': ['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu'],
+}
 
-take_screenshot("https://example.com", "example_screenshot.png")
+# Point at an already running Chromium (e.g. one started with
+# --remote-debugging-port=9222) to skip launching a browser at all
+CDP_ENDPOINT = os.environ.get('PLAYWRIGHT_CDP_ENDPOINT')
+
+# One Chromium per event loop, launched on first use and reused by every call on that
+# loop. Concurrent first callers all await the same launch task instead of each starting
+# one. close_browser() shuts it down; for callers that never do, a watcher task stops
+# Playwright when asyncio.run() cancels the loop's tasks, so no driver outlives its loop
+_launches = {}
+
+async def _start_browser():
+    pw = await async_playwright().start()
+    try:
+        if CDP_ENDPOINT:
+            browser = await pw.chromium.connect_over_cdp(CDP_ENDPOINT)
+        else:
+            browser = await pw.chromium.launch(headless=True, **LAUNCH_OPTIONS)
+    except BaseException:
+        await pw.stop()
+        raise
+    loop = asyncio.get_running_loop()
+    watcher = loop.create_task(_stop_with_loop(loop, asyncio.current_task(), pw))
+    return pw, browser, watcher
+
+async def _stop_with_loop(loop, launch, pw):
+    try:
+        await loop.create_future()
+    finally:
+        # Only forget our own launch; close_browser() may already have made way for a new one
+        if _launches.get(loop) is launch:
+            del _launches[loop]
+        # Closing the driver's stdin makes it exit and take its browsers with it
+        await pw.stop()
+
+async def get_browser():
+    loop = asyncio.get_running_loop()
+    launch = _launches.get(loop)
+    if launch is None:
+        launch = _launches[loop] = loop.create_task(_start_browser())
+    try:
+        # shield: a caller being cancelled must not cancel the launch the others wait on
+        return (await asyncio.shield(launch))[1]
+    except Exception:
+        if _launches.get(loop) is launch:
+            del _launches[loop]  # let the next caller retry
+        raise
+
+async def close_browser():
+    launch = _launches.pop(asyncio.get_running_loop(), None)
+    if launch is None:
+        return
+    try:
+        pw, browser, watcher = await launch
+    except Exception:
+        return
+    # A shared browser outlives us; stopping Playwright just disconnects
+    if not CDP_ENDPOINT:
+        await browser.close()
+    # The watcher stops Playwright; wait for it so nothing of this launch is left running
+    watcher.cancel()
+    try:
+        await watcher
+    except asyncio.CancelledError:
+        pass
+
+def _write_file(path, data):
+    # Take the bytes back from Playwright and write them with one fd here
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+async def take_screenshots(jobs, concurrency=4):
+    # One context for the whole batch; each (url, output_path) job gets a page.
+    # A single browser serializes screenshots past ~10 pages, so bound it.
+    context = await (await get_browser()).new_context()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(url, output_path):
+        async with sem:
+            page = await context.new_page()
+            try:
+                await page.goto(url)
+                png = await page.screenshot(type='png')
+                await asyncio.to_thread(_write_file, output_path, png)
+            finally:
+                await page.close()
+
+    try:
+        # Let every job finish before the context closes under them, then report the first failure
+        results = await asyncio.gather(*(one(url, path) for url, path in jobs), return_exceptions=True)
+    finally:
+        await context.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+async def take_screenshot(url, output_path):
+    await take_screenshots([(url, output_path)])
+
+async def _shard_screenshots(shard):
+    try:
+        await take_screenshots(shard)
+    finally:
+        await close_browser()
+
+def _run_shard(shard):
+    asyncio.run(_shard_screenshots(shard))
+
+def take_screenshots_mp(jobs, workers=None):
+    # One browser serializes its screenshots, so for large batches run one
+    # worker process per core, each with its own pooled Chromium
+    jobs = list(jobs)
+    if not jobs:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        asyncio.run(_shard_screenshots(jobs))
+        return
+    shards = [jobs[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # list() re-raises the first failure from any worker
+        list(pool.map(_run_shard, shards))
+
+async def main():
+    try:
+        await take_screenshot("https://example.com", "example_screenshot.png")
+    finally:
+        await close_browser()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+import ast
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / "autogen-autodebug-flow-group.py"
+
+
+def load_span_helpers():
+    # The script needs autogen, a screen and an API key at import; pull out just the
+    # pure span and edit helpers so the edit checks can be tested on their own
+    tree = ast.parse(SCRIPT.read_text())
+    wanted = {
+        "parse_source", "function_spans", "check_edit_locally",
+        "backup_file", "cached_function_spans", "apply_edits",
+    }
+    module = ast.Module(
+        body=[node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name in wanted],
+        type_ignores=[],
+    )
+    namespace = {
+        "ast": ast, "logging": logging, "os": os, "shutil": shutil, "tempfile": tempfile,
+        "_clonefile": None, "_span_cache": {},
+    }
+    exec(compile(module, str(SCRIPT), "exec"), namespace)
+    return namespace
+
+
+helpers = load_span_helpers()
+parse_source = helpers["parse_source"]
+function_spans = helpers["function_spans"]
+check_edit_locally = helpers["check_edit_locally"]
+apply_edits = helpers["apply_edits"]
+
+
+def apply(source, start_line, end_line, new_code):
+    lines = source.splitlines(True)
+    spans = function_spans(parse_source(source, "<test>"))
+    updated = check_edit_locally("<test>", lines, spans, start_line, end_line, new_code)
+    lines[start_line - 1:end_line] = (new_code + "\n").splitlines(True)
+    return updated, "".join(lines)
+
+
+def test_edit_covering_nested_def_is_not_vouched_for():
+    source = "def outer():\n    def inner():\n        return 1\n\nx = 1\n"
+    updated, _ = apply(source, 2, 3, "")
+    assert updated is None
+
+
+def test_edit_replacing_only_member_of_class_is_not_vouched_for():
+    source = "class A:\n    def f(self):\n        return 1\n"
+    updated, _ = apply(source, 2, 3, "    # removed")
+    assert updated is None
+
+
+def test_ancestor_end_follows_trimmed_nested_def():
+    source = (
+        "def outer():\n"
+        "    x = 1\n"
+        "    def inner():\n"
+        "        a = 1\n"
+        "        return a\n"
+    )
+    updated, new_source = apply(source, 5, 5, "        return 2\n")
+    assert updated == function_spans(parse_source(new_source, "<test>"))
+
+
+def test_ancestor_end_shifts_when_it_continues_after_edit():
+    source = (
+        "def outer():\n"
+        "    def inner():\n"
+        "        return 1\n"
+        "    return inner\n"
+    )
+    updated, new_source = apply(source, 3, 3, "        a = 1\n        return a")
+    assert updated == function_spans(parse_source(new_source, "<test>"))
+
+
+def edit_file(source, edits):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "target.py")
+        with open(path, "w") as f:
+            f.write(source)
+        result = apply_edits(path, edits)
+        with open(path) as f:
+            return result, f.read()
+
+
+def test_edits_are_applied_against_original_line_numbers():
+    source = "a = 1\nb = 2\nc = 3\nd = 4\n"
+    # Given out of order, and the first edit grows the file: both still hit their original lines
+    result, new_source = edit_file(source, [
+        {"start_line": 1, "end_line": 1, "new_code": "a = 10\na2 = 11"},
+        {"start_line": 4, "end_line": 4, "new_code": "d = 40"},
+        {"start_line": 2, "end_line": 3, "new_code": "bc = 23"},
+    ])
+    assert result == (0, "Modified successfully")
+    assert new_source == "a = 10\na2 = 11\nbc = 23\nd = 40\n"
+
+
+def test_overlapping_edits_are_rejected_and_file_untouched():
+    source = "a = 1\nb = 2\nc = 3\n"
+    result, new_source = edit_file(source, [
+        {"start_line": 1, "end_line": 2, "new_code": "x = 1"},
+        {"start_line": 2, "end_line": 3, "new_code": "y = 2"},
+    ])
+    assert result == (1, "Invalid line range")
+    assert new_source == source
+
+
+def test_out_of_range_edit_is_rejected():
+    source = "a = 1\n"
+    result, new_source = edit_file(source, [{"start_line": 1, "end_line": 2, "new_code": "a = 2"}])
+    assert result == (1, "Invalid line range")
+    assert new_source == source
+
+
+def test_edits_producing_bad_syntax_leave_file_untouched():
+    source = "def f():\n    return 1\n\nx = 2\n"
+    result, new_source = edit_file(source, [
+        {"start_line": 2, "end_line": 2, "new_code": "    return ("},
+        {"start_line": 4, "end_line": 4, "new_code": "x = 3"},
+    ])
+    assert result[0] == 1 and result[1].startswith("Syntax error")
+    assert new_source == source
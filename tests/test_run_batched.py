@@ -0,0 +1,56 @@
+import shlex
+import subprocess
+from pathlib import Path
+from typing import List
+
+APP = Path(__file__).resolve().parent.parent / "gui" / "src" / "python-app-nicegui.py"
+
+
+def load_run_batched():
+    # The app needs nicegui at import, so cut run_batched out of the source (up to the
+    # next top-level line) and run it against plain sh with nothing cancelled
+    source = APP.read_text()
+    lines = source[source.index("def run_batched("):].splitlines(True)
+    body = [lines[0]]
+    for line in lines[1:]:
+        if line.strip() and not line[0].isspace():
+            break
+        body.append(line)
+    namespace = {
+        "List": List, "shlex": shlex, "subprocess": subprocess,
+        "_running_procs": set(), "run_cancelled": lambda: False, "ensure_sudo": lambda: True,
+    }
+    exec(compile("".join(body), str(APP), "exec"), namespace)
+    return namespace
+
+
+helpers = load_run_batched()
+run_batched = helpers["run_batched"]
+
+
+def test_exit_codes_are_returned_in_order():
+    cmds = [["true"], ["false"], ["sh", "-c", "exit 3"], ["true"]]
+    assert run_batched(cmds, sudo=False) == [0, 1, 3, 0]
+
+
+def test_command_output_does_not_confuse_markers():
+    cmds = [["echo", "__RC_1__7"], ["sh", "-c", "echo __RC_0__9 >&2; exit 2"]]
+    assert run_batched(cmds, sudo=False) == [0, 2]
+
+
+def test_arguments_are_quoted():
+    cmds = [["sh", "-c", "test \"$0\" = 'a b;c'", "a b;c"]]
+    assert run_batched(cmds, sudo=False) == [0]
+
+
+def test_empty_batch_runs_nothing():
+    assert run_batched([], sudo=False) == []
+
+
+def test_cancelled_run_fails_every_command():
+    helpers["run_cancelled"] = lambda: True
+    try:
+        assert run_batched([["true"], ["true"]], sudo=False) == [1, 1]
+    finally:
+        helpers["run_cancelled"] = lambda: False
+    assert not helpers["_running_procs"]